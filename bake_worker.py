@@ -0,0 +1,45 @@
+# Worker bake'a uruchamiany w tle przez texture_baker (tryb równoległy):
+#   blender -t <wątki> -b plik.blend --factory-startup --python bake_worker.py -- zadanie.json
+# Bake'uje jeden kanał dla materiałów jednego obiektu, zapisuje obrazy i plik z wynikiem.
+# Nie zapisuje .blend - podpięcie tekstur robi sesja nadrzędna.
+import bpy
+import json
+import os
+import sys
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import texture_baker
+
+def run(job_path):
+    with open(job_path) as f:
+        job = json.load(f)
+
+    result = {"error": None}
+    try:
+        scene = bpy.context.scene
+        if scene.render.engine != 'CYCLES':
+            scene.render.engine = 'CYCLES'
+
+        obj = bpy.data.objects[job["object"]]
+        materials = [bpy.data.materials[name] for name in job["materials"]]
+        channel = texture_baker.channel_by_suffix(job["suffix"])
+        result["error"] = texture_baker.bake_channel(
+            bpy.context, obj, materials, channel, job["size"], job["output_path"], assign=False,
+            constants=job.get("constants")
+        )
+    except Exception as e:
+        traceback.print_exc()
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    with open(job["result"] + ".tmp", "w") as f:
+        json.dump(result, f)
+    os.replace(job["result"] + ".tmp", job["result"])
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if not argv:
+        print("usage: blender -b file.blend --python bake_worker.py -- job.json")
+        sys.exit(1)
+    run(argv[0])
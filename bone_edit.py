@@ -1,12 +1,375 @@
 import bpy
-import bmesh
 import mathutils
+import numpy as np
 from bpy.props import StringProperty, FloatProperty, EnumProperty
 
 prefixAdd = "Brak"  
 
 class BoneEditProps(bpy.types.PropertyGroup):
-    density: bpy.props.IntProperty(name="Density", min=1, default=1)
+    min_spacing: bpy.props.FloatProperty(
+        name="Min Spacing",
+        description="Minimum distance between generated bones (world units)",
+        default=0.1,
+        min=0.0001,
+        subtype='DISTANCE'
+    )
+    chain_segments: bpy.props.IntProperty(
+        name="Bones per Chain",
+        description="Resample every chain to this many bones by arc length (0 = one bone per edge)",
+        default=0,
+        min=0
+    )
+    auto_skin: bpy.props.BoolProperty(
+        name="Auto Skin",
+        description="Create vertex groups for the new bones and fill them with distance-based weights",
+        default=False
+    )
+    skin_radius: bpy.props.FloatProperty(
+        name="Skin Radius",
+        description="Distance from a bone at which its influence fades to zero",
+        default=0.2,
+        min=0.0001,
+        subtype='DISTANCE'
+    )
+    skin_falloff: bpy.props.FloatProperty(name="Skin Falloff", default=2.0, min=0.1, max=8.0)
+    skin_max_influences: bpy.props.IntProperty(name="Max Influences", default=4, min=1, max=8)
+    bone_orientation: bpy.props.EnumProperty(
+        name="Orientation",
+        items=[
+            ('FIXED', "Fixed +Y", "Point every bone along world +Y"),
+            ('NORMAL', "Normal", "Point bones along the vertex normal"),
+            ('PRINCIPAL', "Surface Axis", "Point bones along the principal axis of the vertex neighbourhood, roll aligned to the normal"),
+        ],
+        default='FIXED'
+    )
+    mirror_pair: bpy.props.BoolProperty(
+        name="Create Symmetric Pair",
+        description="Also create the opposite-side bone, mirrored across the armature X axis",
+        default=False
+    )
+    chain_root: bpy.props.EnumProperty(
+        name="Chain Root",
+        items=[
+            ('TOP', "Top", "Start chains at the highest end"),
+            ('BOTTOM', "Bottom", "Start chains at the lowest end"),
+        ],
+        default='TOP'
+    )
+
+class BoneNameAllocator:
+    """Unikalne, kolejne nazwy kości dla jednej armatury; istniejące nazwy zbierane są raz."""
+
+    def __init__(self, arm_obj, suffixes=("",)):
+        bones = arm_obj.data.edit_bones if arm_obj.mode == 'EDIT' else arm_obj.data.bones
+        self.used = {bone.name for bone in bones}
+        self.suffixes = suffixes
+        self.next_index = {}
+        self.next_stem = {}
+
+    def _free(self, stem, index):
+        return all(f"{stem}_{index}{suffix}" not in self.used for suffix in self.suffixes)
+
+    def allocate(self, stem, count):
+        # Zwraca listę nazw dla każdego sufiksu - indeks jest wolny dla wszystkich stron naraz
+        index = self.next_index.get(stem, 0)
+        indices = []
+        while len(indices) < count:
+            if self._free(stem, index):
+                indices.append(index)
+            index += 1
+        self.next_index[stem] = index
+
+        names = [[f"{stem}_{i}{suffix}" for i in indices] for suffix in self.suffixes]
+        for side in names:
+            self.used.update(side)
+        return names
+
+    def allocate_stem(self, base):
+        index = self.next_stem.get(base, 0)
+        while not self._free(f"{base}_{index}", 0):
+            index += 1
+        self.next_stem[base] = index + 1
+        return f"{base}_{index}"
+
+def name_suffixes(context):
+    prefix = context.scene.bone_prefix
+    side = prefix if prefix in [".L", ".R"] else ""
+    if context.scene.prop_bone_edit.mirror_pair:
+        side = side or ".L"
+        return (side, ".R" if side == ".L" else ".L")
+    return (side,)
+
+def mirror_world_points(arm_obj, points, vectors=False):
+    # Odbicie względem osi X armatury
+    matrix = np.array(arm_obj.matrix_world, dtype=np.float64)
+    inv = np.linalg.inv(matrix)
+    local = points @ inv[:3, :3].T
+    if not vectors:
+        local += inv[:3, 3]
+    local[:, 0] *= -1.0
+    world = local @ matrix[:3, :3].T
+    return world if vectors else world + matrix[:3, 3]
+
+def plan_bones(context, arm_obj, heads, tails, chain_sizes=None, roll_axes=None):
+    """Nazwy, pozycje, rodzice i osie rolla kości do utworzenia (z lustrzanymi odpowiednikami przy mirror_pair)."""
+    base_name = context.scene.bone_base_name.strip() or "Bone"
+    allocator = BoneNameAllocator(arm_obj, name_suffixes(context))
+
+    if chain_sizes is None:
+        names = allocator.allocate(base_name, len(heads))
+        parents = [-1] * len(heads)
+    else:
+        names = [[] for _ in allocator.suffixes]
+        parents = []
+        for size in chain_sizes:
+            offset = len(parents)
+            for side, chain_names in zip(names, allocator.allocate(allocator.allocate_stem(base_name), size)):
+                side += chain_names
+            parents += [-1] + [offset + i for i in range(size - 1)]
+
+    if len(names) == 1:
+        return names[0], heads, tails, parents, roll_axes
+
+    count = len(heads)
+    if roll_axes is not None:
+        roll_axes = np.concatenate([roll_axes, mirror_world_points(arm_obj, roll_axes, vectors=True)])
+    return (
+        names[0] + names[1],
+        np.concatenate([heads, mirror_world_points(arm_obj, heads)]),
+        np.concatenate([tails, mirror_world_points(arm_obj, tails)]),
+        parents + [p + count if p >= 0 else -1 for p in parents],
+        roll_axes,
+    )
+
+def world_to_armature(arm_obj, points):
+    inv = np.array(arm_obj.matrix_world.inverted(), dtype=np.float64)
+    return points @ inv[:3, :3].T + inv[:3, 3]
+
+def create_edit_bones(arm_obj, names, heads, tails, parents=None, roll_axes=None):
+    """Tworzy kości w trybie edycji armatury; heads/tails to tablice (n, 3) w przestrzeni świata.
+
+    parents[i] to indeks (w names) połączonego rodzica kości i albo -1,
+    roll_axes[i] to wektor (świat), do którego wyrównywana jest oś Z kości.
+    """
+    edit_bones = arm_obj.data.edit_bones
+    start = len(edit_bones)
+    heads = world_to_armature(arm_obj, np.asarray(heads, dtype=np.float64)).astype(np.float32)
+    tails = world_to_armature(arm_obj, np.asarray(tails, dtype=np.float64)).astype(np.float32)
+
+    new_bones = [edit_bones.new(name) for name in names]
+    if not new_bones:
+        return new_bones
+
+    if len(edit_bones) == start + len(new_bones) and edit_bones[-1] == new_bones[-1]:
+        # Nowe kości są na końcu kolekcji - jeden zapis head/tail dla wszystkich
+        for attr, values in (("head", heads), ("tail", tails)):
+            coords = np.empty(len(edit_bones) * 3, dtype=np.float32)
+            edit_bones.foreach_get(attr, coords)
+            coords = coords.reshape(-1, 3)
+            coords[start:] = values
+            edit_bones.foreach_set(attr, coords.ravel())
+    else:
+        for bone, head, tail in zip(new_bones, heads.tolist(), tails.tolist()):
+            bone.head = head
+            bone.tail = tail
+
+    if roll_axes is not None:
+        inv = np.array(arm_obj.matrix_world.inverted(), dtype=np.float64)
+        for bone, axis in zip(new_bones, (np.asarray(roll_axes) @ inv[:3, :3].T).tolist()):
+            bone.align_roll(axis)
+
+    if parents is not None:
+        for bone, parent in zip(new_bones, parents):
+            if parent >= 0:
+                bone.parent = new_bones[parent]
+                bone.use_connect = True
+    return new_bones
+
+def bbox_centers_world(objects):
+    corners = np.array([obj.bound_box[:] for obj in objects], dtype=np.float64)
+    centers = np.ones((len(objects), 4))
+    centers[:, :3] = corners.mean(axis=1)
+    matrices = np.array([obj.matrix_world for obj in objects], dtype=np.float64)
+    return np.einsum('nij,nj->ni', matrices, centers)[:, :3]
+
+def selected_vertices_world(obj):
+    """Indeksy i pozycje (w przestrzeni świata) zaznaczonych wierzchołków, czytane hurtowo z atrybutów."""
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+    mesh = obj.data
+    select = np.zeros(len(mesh.vertices), dtype=bool)
+    attr = mesh.attributes.get(".select_vert")
+    if attr is not None:
+        attr.data.foreach_get("value", select)
+    else:
+        mesh.vertices.foreach_get("select", select)
+    indices = np.flatnonzero(select)
+
+    return indices, world_positions(obj)[indices]
+
+def world_positions(obj):
+    mesh = obj.data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.attributes["position"].data.foreach_get("vector", co)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    return co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+
+# Ile par (wierzchołek, kość) liczymy naraz - tablice pośrednie mają rozmiar chunk x kości
+SKIN_BUDGET = 1 << 20
+SKIN_WEIGHT_STEPS = 1024
+
+def skin_weights(points, heads, tails, radius, falloff, max_influences):
+    """Dla każdego wierzchołka max_influences najbliższych kości (indeksy, znormalizowane wagi).
+
+    Waga zależy od odległości wierzchołka od odcinka head-tail kości; wierzchołek poza
+    zasięgiem wszystkich kości dostaje pełną wagę najbliższej.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    heads = np.asarray(heads, dtype=np.float32)
+    count = min(max_influences, len(heads))
+    segments = np.asarray(tails, dtype=np.float32) - heads
+    seg_len2 = np.maximum(np.einsum('bi,bi->b', segments, segments), 1e-12)
+    bone_idx = np.empty((len(points), count), dtype=np.int64)
+    weights = np.empty((len(points), count), dtype=np.float32)
+
+    step = max(256, SKIN_BUDGET // max(1, len(heads)))
+    for start in range(0, len(points), step):
+        chunk = points[start:start + step]
+        rel = chunk[:, None, :] - heads[None, :, :]
+        t = np.clip(np.einsum('cbi,bi->cb', rel, segments) / seg_len2, 0.0, 1.0)
+        dist = np.linalg.norm(rel - t[..., None] * segments[None, :, :], axis=2)
+
+        if count < len(heads):
+            idx = np.argpartition(dist, count - 1, axis=1)[:, :count]
+        else:
+            idx = np.broadcast_to(np.arange(count), dist.shape).copy()
+        near = np.take_along_axis(dist, idx, axis=1)
+        w = np.clip(1.0 - near / radius, 0.0, 1.0) ** falloff
+
+        total = w.sum(axis=1)
+        empty = total <= 0.0
+        if empty.any():
+            w[empty] = 0.0
+            w[empty, np.argmin(near[empty], axis=1)] = 1.0
+            total[empty] = 1.0
+
+        bone_idx[start:start + len(chunk)] = idx
+        weights[start:start + len(chunk)] = w / total[:, None]
+    return bone_idx, weights
+
+def write_vertex_groups(obj, group_names, bone_idx, weights):
+    # Wagi kwantyzowane - jedno vg.add() na (grupa, poziom wagi) zamiast na wierzchołek
+    vertex = np.repeat(np.arange(len(bone_idx)), bone_idx.shape[1])
+    bone = bone_idx.ravel()
+    level = np.rint(weights.ravel() * SKIN_WEIGHT_STEPS).astype(np.int64)
+    keep = level > 0
+    vertex, bone, level = vertex[keep], bone[keep], level[keep]
+
+    order = np.lexsort((vertex, level, bone))
+    vertex, bone, level = vertex[order], bone[order], level[order]
+    keys = bone * (SKIN_WEIGHT_STEPS + 1) + level
+    splits = np.flatnonzero(np.diff(keys)) + 1
+
+    groups = [obj.vertex_groups.get(name) or obj.vertex_groups.new(name=name) for name in group_names]
+    for run_vertex, run_bone, run_level in zip(np.split(vertex, splits), bone[np.r_[0, splits]], level[np.r_[0, splits]]):
+        groups[run_bone].add(run_vertex.tolist(), run_level / SKIN_WEIGHT_STEPS, 'REPLACE')
+
+def auto_skin(context, obj, arm_obj, names, heads, tails):
+    props = context.scene.prop_bone_edit
+    if not props.auto_skin or not names:
+        return
+    bone_idx, weights = skin_weights(world_positions(obj), np.asarray(heads), np.asarray(tails),
+                                     props.skin_radius, props.skin_falloff, props.skin_max_influences)
+    write_vertex_groups(obj, names, bone_idx, weights)
+
+    if not any(m.type == 'ARMATURE' and m.object == arm_obj for m in obj.modifiers):
+        modifier = obj.modifiers.new(name="Armature", type='ARMATURE')
+        modifier.object = arm_obj
+
+def _normalized(vectors):
+    length = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(length, 1e-12)
+
+def vertex_normals_world(obj, indices):
+    mesh = obj.data
+    normals = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertex_normals.foreach_get("vector", normals)
+    normal_matrix = np.linalg.inv(np.array(obj.matrix_world, dtype=np.float64)[:3, :3]).T
+    return _normalized(normals.reshape(-1, 3)[indices] @ normal_matrix.T)
+
+def principal_axes_world(obj, indices):
+    """Główna oś (PCA) sąsiedztwa 1-ring każdego wskazanego wierzchołka, liczona dla wszystkich naraz."""
+    mesh = obj.data
+    count = len(mesh.vertices)
+    co = np.empty(count * 3, dtype=np.float32)
+    mesh.attributes["position"].data.foreach_get("vector", co)
+    co = co.reshape(-1, 3).astype(np.float64) @ np.array(obj.matrix_world, dtype=np.float64)[:3, :3].T
+
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edges)
+    edges = edges.reshape(-1, 2)
+
+    rows = np.full(count, -1, dtype=np.int64)
+    rows[indices] = np.arange(len(indices))
+    cov = np.zeros((len(indices), 9))
+    for a, b in ((0, 1), (1, 0)):
+        use = rows[edges[:, a]] >= 0
+        d = co[edges[use, b]] - co[edges[use, a]]
+        outer = (d[:, :, None] * d[:, None, :]).reshape(-1, 9)
+        target = rows[edges[use, a]]
+        for k in range(9):
+            cov[:, k] += np.bincount(target, weights=outer[:, k], minlength=len(indices))
+
+    _, vectors = np.linalg.eigh(cov.reshape(-1, 3, 3))
+    axes = vectors[:, :, -1]
+    # Jednoznaczny zwrot: największa składowa dodatnia
+    sign = np.sign(axes[np.arange(len(axes)), np.argmax(np.abs(axes), axis=1)])
+    return _normalized(axes * sign[:, None])
+
+def orient_bones(context, obj, indices, heads):
+    """Ogony i osie rolla kości wg ustawienia bone_orientation."""
+    props = context.scene.prop_bone_edit
+    size = context.scene.bone_size
+    if props.bone_orientation == 'NORMAL':
+        return heads + vertex_normals_world(obj, indices) * size, None
+    if props.bone_orientation == 'PRINCIPAL':
+        normals = vertex_normals_world(obj, indices)
+        return heads + principal_axes_world(obj, indices) * size, normals
+    return heads + np.array((0.0, size, 0.0)), None
+
+def leave_to_object_mode(context):
+    obj = context.view_layer.objects.active
+    mode = obj.mode if obj else 'OBJECT'
+    if mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    return obj, mode
+
+def restore_mode(context, obj, mode):
+    context.view_layer.objects.active = obj
+    if obj and mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode=mode)
+
+def add_bones(context, obj, mode, arm_obj, names, heads, tails, parents=None, roll_axes=None):
+    """Dane siatki (pozycje, orientacja, wagi skinningu) zebrane wcześniej w trybie obiektowym -
+    tu tylko jedna sesja edycji armatury i powrót do trybu, z którego wystartowano.
+    """
+    # Nazwy z BoneNameAllocator są wolne, więc skinning może zapisać grupy przed utworzeniem kości
+    auto_skin(context, obj, arm_obj, names, heads, tails)
+
+    context.view_layer.objects.active = arm_obj
+    bpy.ops.object.mode_set(mode='EDIT')
+    created = create_edit_bones(arm_obj, names, heads, tails, parents, roll_axes)
+    created_names = [bone.name for bone in created]
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    # Blender mógł skrócić zbyt długą nazwę - grupa wierzchołków musi nazywać się jak kość
+    for planned, name in zip(names, created_names):
+        group = obj.vertex_groups.get(planned)
+        if planned != name and group is not None:
+            group.name = name
+
+    restore_mode(context, obj, mode)
+    return created_names
 
 class BoneFromSelected(bpy.types.Operator):
     bl_idname = "object.bones_from_selected"
@@ -28,28 +391,18 @@ class BoneFromSelected(bpy.types.Operator):
 
         arm_obj = bpy.data.objects[armature_name]
 
-        for obj in selected_objects:
-            bpy.context.view_layer.objects.active = obj
+        # Środki bounding boxów bez transform_apply - mesh zostaje nietknięty
+        heads = bbox_centers_world(selected_objects)
+        tails = heads + np.array((0.0, size, 0.0))
+
+        if context.object and context.object.mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
+        names, heads, tails, parents, _ = plan_bones(context, arm_obj, heads, tails)
 
         bpy.context.view_layer.objects.active = arm_obj
         bpy.ops.object.mode_set(mode='EDIT')
 
-        for i, obj in enumerate(selected_objects):
-            # Wylicz środek bounding boxa
-            bbox_center_local = 0.125 * sum((mathutils.Vector(corner) for corner in obj.bound_box), mathutils.Vector())
-            bbox_center_world = obj.matrix_world @ bbox_center_local
-
-            base_name = context.scene.bone_base_name.strip()
-            bone_name = f"{base_name}_{i}" if base_name else f"Bone_{i}"
-            prefix = context.scene.bone_prefix
-            if prefix in [".L", ".R"]:
-                bone_name += prefix
-
-            bone = arm_obj.data.edit_bones.new(bone_name)
-            bone.head = bbox_center_world
-            bone.tail = bbox_center_world + mathutils.Vector((0, size, 0))
+        create_edit_bones(arm_obj, names, heads, tails, parents)
 
         bpy.ops.object.mode_set(mode='OBJECT')
         return {'FINISHED'}
@@ -60,112 +413,243 @@ class BoneFromVertexOperator(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        size = context.scene.bone_size
         armature_name = context.scene.armature_name
         obj = context.active_object
 
-        if obj.type != 'MESH':
+        if not obj or obj.type != 'MESH':
             self.report({'ERROR'}, "Select mesh object")
             return {'CANCELLED'}
 
-        # Apply transforms
-        bpy.context.view_layer.objects.active = obj
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-
         if armature_name not in bpy.data.objects:
             self.report({'ERROR'}, f"Armature '{armature_name}' doesn't exist!")
             return {'CANCELLED'}
 
         arm_obj = bpy.data.objects[armature_name]
 
-        bpy.ops.object.mode_set(mode='EDIT')
-        bm = bmesh.from_edit_mesh(obj.data)
-        world_positions = [obj.matrix_world @ v.co.copy() for v in bm.verts if v.select]
-        bpy.ops.object.mode_set(mode='OBJECT')
+        obj, mode = leave_to_object_mode(context)
+        indices, heads = selected_vertices_world(obj)
 
-        if not world_positions:
+        if not len(heads):
+            restore_mode(context, obj, mode)
             self.report({'ERROR'}, "No vertices were marked!")
             return {'CANCELLED'}
 
-        bpy.context.view_layer.objects.active = arm_obj
-        bpy.ops.object.mode_set(mode='EDIT')
-
-        for i, world_pos in enumerate(world_positions):
-            base_name = context.scene.bone_base_name.strip()
-            bone_name = f"{base_name}_{i}" if base_name else f"Bone_{i}"
-            prefix = context.scene.bone_prefix
-            if prefix in [".L", ".R"]:
-                bone_name += prefix
-
-            bone = arm_obj.data.edit_bones.new(bone_name)
-            bone.head = world_pos
-            bone.tail = world_pos + mathutils.Vector((0, size, 0))
-
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        bpy.context.view_layer.objects.active = obj
-        bpy.ops.object.mode_set(mode='EDIT')
+        tails, rolls = orient_bones(context, obj, indices, heads)
+        names, heads, tails, parents, rolls = plan_bones(context, arm_obj, heads, tails, roll_axes=rolls)
+        add_bones(context, obj, mode, arm_obj, names, heads, tails, parents, rolls)
 
         return {'FINISHED'}
 
+def poisson_disk_indices(points, spacing):
+    """Indeksy punktów rozłożonych równomiernie, oddalonych od siebie o co najmniej spacing."""
+    if not len(points):
+        return np.empty(0, dtype=np.int64)
+
+    origin = points.min(axis=0)
+    cells = np.floor((points - origin) / spacing).astype(np.int64)
+
+    # Jeden kandydat na komórkę siatki - punkt najbliżej jej środka
+    offset = np.linalg.norm(points - origin - (cells + 0.5) * spacing, axis=1)
+    order = np.lexsort((np.arange(len(points)), offset, cells[:, 2], cells[:, 1], cells[:, 0]))
+    sorted_cells = cells[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.any(sorted_cells[1:] != sorted_cells[:-1], axis=1)
+    candidates = order[first]
+
+    # Odrzucanie kandydatów bliższych niż spacing do już przyjętych (sąsiednie komórki).
+    # Komórki o tym samym (cx % 3, cy % 3, cz % 3) nie sąsiadują ze sobą, więc każdą
+    # z 27 klas sprawdzamy naraz - wystarczy porównać ją z punktami przyjętymi wcześniej
+    cand_cells = cells[candidates] + 1
+    dims = cand_cells.max(axis=0) + 2
+    cand_keys = (cand_cells[:, 0] * dims[1] + cand_cells[:, 1]) * dims[2] + cand_cells[:, 2]
+    cand_points = points[candidates]
+    offsets = [(dx * dims[1] + dy) * dims[2] + dz
+               for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1) if dx or dy or dz]
+    phase = ((cand_cells % 3) * (9, 3, 1)).sum(axis=1)
+
+    r2 = spacing * spacing
+    acc_keys = np.empty(0, dtype=np.int64)
+    acc_points = np.empty((0, 3), dtype=points.dtype)
+    acc_index = np.empty(0, dtype=np.int64)
+    for k in range(27):
+        sel = np.flatnonzero(phase == k)
+        if not len(sel):
+            continue
+        keep = np.ones(len(sel), dtype=bool)
+        if len(acc_keys):
+            for off in offsets:
+                nk = cand_keys[sel] + off
+                pos = np.minimum(np.searchsorted(acc_keys, nk), len(acc_keys) - 1)
+                hit = acc_keys[pos] == nk
+                d2 = ((acc_points[pos] - cand_points[sel]) ** 2).sum(axis=1)
+                keep &= ~(hit & (d2 < r2))
+        sel = sel[keep]
+        acc_keys = np.concatenate((acc_keys, cand_keys[sel]))
+        acc_points = np.concatenate((acc_points, cand_points[sel]))
+        acc_index = np.concatenate((acc_index, candidates[sel]))
+        order = np.argsort(acc_keys, kind='stable')
+        acc_keys, acc_points, acc_index = acc_keys[order], acc_points[order], acc_index[order]
+
+    return np.sort(acc_index)
+
 class BoneFromVertexOperatorDensity(bpy.types.Operator):
     bl_idname = "object.bones_from_vertices_density"
     bl_label = "Add bones to selected vertices with density"
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        size = context.scene.bone_size
         armature_name = context.scene.armature_name
-        density = max(1, context.scene.prop_bone_edit.density)  # Pobieramy density z prop_bone_edit
+        spacing = context.scene.prop_bone_edit.min_spacing
         obj = context.active_object
 
-        if obj.type != 'MESH':
+        if not obj or obj.type != 'MESH':
             self.report({'ERROR'}, "Select mesh object")
             return {'CANCELLED'}
 
-        bpy.context.view_layer.objects.active = obj
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-
         if armature_name not in bpy.data.objects:
             self.report({'ERROR'}, f"Armature '{armature_name}' doesn't exist!")
             return {'CANCELLED'}
 
         arm_obj = bpy.data.objects[armature_name]
 
-        bpy.ops.object.mode_set(mode='EDIT')
-        bm = bmesh.from_edit_mesh(obj.data)
-        world_positions = [obj.matrix_world @ v.co.copy() for v in bm.verts if v.select]
-        bpy.ops.object.mode_set(mode='OBJECT')
+        obj, mode = leave_to_object_mode(context)
+        indices, points = selected_vertices_world(obj)
 
-        if not world_positions:
+        if not len(points):
+            restore_mode(context, obj, mode)
             self.report({'ERROR'}, "No vertices were marked!")
             return {'CANCELLED'}
 
-        bpy.context.view_layer.objects.active = arm_obj
-        bpy.ops.object.mode_set(mode='EDIT')
+        picked = poisson_disk_indices(points, spacing)
+        heads = points[picked]
+        tails, rolls = orient_bones(context, obj, indices[picked], heads)
+        names, heads, tails, parents, rolls = plan_bones(context, arm_obj, heads, tails, roll_axes=rolls)
+        add_bones(context, obj, mode, arm_obj, names, heads, tails, parents, rolls)
 
-        base_name = context.scene.bone_base_name.strip()
-        prefix = context.scene.bone_prefix
+        return {'FINISHED'}
+        
+def edge_chains(mesh, select):
+    """Ścieżki i pętle z zaznaczonych krawędzi, jako listy indeksów wierzchołków.
+
+    Krawędzie bierzemy z atrybutu .select_edge; bez niego - krawędzie o obu zaznaczonych końcach.
+
+    Wierzchołki o stopniu innym niż 2 kończą łańcuch; pętla kończy się swoim pierwszym wierzchołkiem.
+    """
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edges)
+    edges = edges.reshape(-1, 2)
+    attr = mesh.attributes.get(".select_edge")
+    if attr is not None:
+        edge_select = np.zeros(len(edges), dtype=bool)
+        attr.data.foreach_get("value", edge_select)
+        edges = edges[edge_select]
+    else:
+        edges = edges[select[edges[:, 0]] & select[edges[:, 1]]]
+    if not len(edges):
+        return []
+
+    # Sąsiedztwo w postaci CSR: dla wierzchołka v krawędzie offsets[v]:offsets[v + 1]
+    count = len(select)
+    src = np.concatenate([edges[:, 0], edges[:, 1]])
+    order = np.argsort(src, kind='stable')
+    dst = np.concatenate([edges[:, 1], edges[:, 0]])[order].tolist()
+    edge_ids = np.concatenate([np.arange(len(edges))] * 2)[order].tolist()
+    degree = np.bincount(src, minlength=count)
+    offsets = np.concatenate([[0], np.cumsum(degree)]).tolist()
+    visited = bytearray(len(edges))
+
+    def walk(start, slot):
+        chain = [start]
+        visited[edge_ids[slot]] = 1
+        current = dst[slot]
+        while True:
+            chain.append(current)
+            if offsets[current + 1] - offsets[current] != 2:
+                break
+            slot = offsets[current]
+            if visited[edge_ids[slot]]:
+                slot += 1
+            if visited[edge_ids[slot]]:
+                break
+            visited[edge_ids[slot]] = 1
+            current = dst[slot]
+        return chain
+
+    chains = []
+    ends = np.flatnonzero((degree > 0) & (degree != 2)).tolist()
+    loops = np.flatnonzero(degree == 2).tolist()
+    for v in ends:
+        for slot in range(offsets[v], offsets[v + 1]):
+            if not visited[edge_ids[slot]]:
+                chains.append(walk(v, slot))
+    for v in loops:
+        if not visited[edge_ids[offsets[v]]]:
+            chains.append(walk(v, offsets[v]))
+    return chains
+
+def resample_chain(points, segments):
+    lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    distance = np.concatenate([[0.0], np.cumsum(lengths)])
+    if distance[-1] <= 0.0:
+        return points
+    samples = np.linspace(0.0, distance[-1], segments + 1)
+    return np.stack([np.interp(samples, distance, points[:, axis]) for axis in range(3)], axis=1)
+
+class BoneChainsFromEdgesOperator(bpy.types.Operator):
+    bl_idname = "object.bone_chains_from_edges"
+    bl_label = "Add bone chains to selected edges"
+    bl_options = {'REGISTER', 'UNDO'}
 
-        for i, world_pos in enumerate(world_positions[::density]):
-            bone_index = i * density  # Dla spójności nazw
-            bone_name = f"{base_name}_{bone_index}" if base_name else f"Bone_{bone_index}"
-            if prefix in [".L", ".R"]:
-                bone_name += prefix
+    def execute(self, context):
+        props = context.scene.prop_bone_edit
+        armature_name = context.scene.armature_name
+        obj = context.active_object
 
-            bone = arm_obj.data.edit_bones.new(bone_name)
-            bone.head = world_pos
-            bone.tail = world_pos + mathutils.Vector((0, size, 0))
+        if not obj or obj.type != 'MESH':
+            self.report({'ERROR'}, "Select mesh object")
+            return {'CANCELLED'}
 
-        bpy.ops.object.mode_set(mode='OBJECT')
+        if armature_name not in bpy.data.objects:
+            self.report({'ERROR'}, f"Armature '{armature_name}' doesn't exist!")
+            return {'CANCELLED'}
 
-        bpy.context.view_layer.objects.active = obj
-        bpy.ops.object.mode_set(mode='EDIT')
+        arm_obj = bpy.data.objects[armature_name]
 
+        obj, mode = leave_to_object_mode(context)
+        indices, world = selected_vertices_world(obj)
+        select = np.zeros(len(obj.data.vertices), dtype=bool)
+        select[indices] = True
+        positions = np.zeros((len(select), 3))
+        positions[indices] = world
+
+        chains = edge_chains(obj.data, select)
+        if not chains:
+            restore_mode(context, obj, mode)
+            self.report({'ERROR'}, "No edges were marked!")
+            return {'CANCELLED'}
+
+        heads, tails, chain_sizes = [], [], []
+        for chain in chains:
+            points = positions[chain]
+            closed = chain[0] == chain[-1]
+            if not closed:
+                top_first = points[0, 2] >= points[-1, 2]
+                if top_first != (props.chain_root == 'TOP'):
+                    points = points[::-1]
+            if props.chain_segments > 0:
+                points = resample_chain(points, props.chain_segments)
+
+            heads.append(points[:-1])
+            tails.append(points[1:])
+            chain_sizes.append(len(points) - 1)
+
+        names, heads, tails, parents, _ = plan_bones(context, arm_obj, np.concatenate(heads),
+                                                  np.concatenate(tails), chain_sizes)
+        names = add_bones(context, obj, mode, arm_obj, names, heads, tails, parents)
+
+        self.report({'INFO'}, f"Created {len(chains)} chains ({len(names)} bones)")
         return {'FINISHED'}
-        
+
 class BoneEditAddPanel(bpy.types.Panel):
     bl_label = "Bone Add"
     bl_idname = "PT_bone_add"
@@ -188,19 +672,35 @@ class BoneEditAddPanel(bpy.types.Panel):
         box.label(text="Base name for bone")
         box.prop(context.scene, "bone_base_name")
 
+        box.prop(props, "bone_orientation")
+        box.prop(props, "auto_skin")
+        if props.auto_skin:
+            col = box.column(align=True)
+            col.prop(props, "skin_radius")
+            col.prop(props, "skin_falloff")
+            col.prop(props, "skin_max_influences")
+
         layout.separator()
 
         box2 = layout.box()
         box2.prop(context.scene, "bone_prefix")
+        box2.prop(props, "mirror_pair")
         box2.operator("object.bones_from_vertices")
         box2.operator("object.bones_from_selected")
 
         layout.separator()
 
         box3 = layout.box()
-        box3.prop(props, "density")
+        box3.prop(props, "min_spacing")
         box3.operator("object.bones_from_vertices_density")
 
+        layout.separator()
+
+        box4 = layout.box()
+        box4.prop(props, "chain_segments")
+        box4.prop(props, "chain_root")
+        box4.operator("object.bone_chains_from_edges")
+
 class BoneEditPanel(bpy.types.Panel):
     bl_label = "Bone Edit"
     bl_idname = "VIEW3D_PT_bone_edit"
@@ -217,7 +717,8 @@ classes = [
     BoneFromVertexOperatorDensity,
     BoneEditPanel,
     BoneEditAddPanel,
-    BoneFromSelected
+    BoneFromSelected,
+    BoneChainsFromEdgesOperator,
 ]
 
 def register():
@@ -1,7 +1,7 @@
 import bpy
 import mathutils
 import math
-import bgl
+import numpy as np
 import gpu
 from gpu_extras.batch import batch_for_shader
 
@@ -15,85 +15,444 @@ class ProportionalMoveProps(bpy.types.PropertyGroup):
     affect_selected_only: bpy.props.BoolProperty(name="Affect Only Selected Bones", default=False)
     use_active_as_center: bpy.props.BoolProperty(name="Use active as center", default=False)
     falloff_exponent: bpy.props.FloatProperty(name="Falloff Smoothness", default=2.0, min=0.1, max=6.0)
+    falloff_type: bpy.props.EnumProperty(
+        name="Falloff",
+        items=[
+            ('LINEAR', "Linear", "Linear falloff"),
+            ('SMOOTH', "Smooth", "Smoothstep falloff"),
+            ('SPHERE', "Sphere", "Spherical falloff"),
+            ('INVERSE_SQUARE', "Inverse Square", "Inverse square falloff"),
+            ('CONSTANT', "Constant", "Constant falloff"),
+            ('CURVE', "Custom", "Custom falloff curve"),
+        ],
+        default='LINEAR'
+    )
     simulation_cloth: bpy.props.BoolProperty(name="Use Simulation Cloth", default=False)
     invert_falloff: bpy.props.BoolProperty(name="Invert falloff", default=False)
     state_shortcut: bpy.props.IntProperty(default=0)
+    apply_to_range: bpy.props.BoolProperty(
+        name="Apply to Frame Range",
+        description="On confirm, offset existing keys of affected bones in the frame range instead of keying the current frame",
+        default=False
+    )
+    range_start: bpy.props.IntProperty(name="Range Start", default=1)
+    range_end: bpy.props.IntProperty(name="Range End", default=250)
+    undo_steps: bpy.props.IntProperty(
+        name="Undo Steps",
+        description="Number of proportional drags kept for the tool's own undo/redo",
+        default=32, min=1, max=256
+    )
+
+def _read_keys(fcurve):
+    count = len(fcurve.keyframe_points)
+    co = np.empty(count * 2, dtype=np.float32)
+    left = np.empty(count * 2, dtype=np.float32)
+    right = np.empty(count * 2, dtype=np.float32)
+    fcurve.keyframe_points.foreach_get("co", co)
+    fcurve.keyframe_points.foreach_get("handle_left", left)
+    fcurve.keyframe_points.foreach_get("handle_right", right)
+    return co.reshape(-1, 2), left.reshape(-1, 2), right.reshape(-1, 2)
+
+def _write_keys(fcurve, co, left, right):
+    fcurve.keyframe_points.foreach_set("co", co.ravel())
+    fcurve.keyframe_points.foreach_set("handle_left", left.ravel())
+    fcurve.keyframe_points.foreach_set("handle_right", right.ravel())
+    fcurve.update()
+
+def offset_fcurve_range(fcurve, delta, frame_start, frame_end):
+    # Przesuwa wartości kluczy (razem z uchwytami) w zakresie klatek
+    if fcurve is None or not len(fcurve.keyframe_points):
+        return False
+    co, left, right = _read_keys(fcurve)
+    mask = (co[:, 0] >= frame_start) & (co[:, 0] <= frame_end)
+    if not mask.any():
+        return False
+    co[mask, 1] += delta
+    left[mask, 1] += delta
+    right[mask, 1] += delta
+    _write_keys(fcurve, co, left, right)
+    return True
+
+def rotate_quaternion_range(fcurves, delta_quat, frame_start, frame_end):
+    # Mnoży klucze kwaternionu (w, x, y, z) przez delta_quat; klucze wszystkich
+    # czterech kanałów muszą leżeć na tych samych klatkach.
+    # False - brak kluczy w zakresie, None - klucze są, ale nie da się ich obrócić
+    present = [fc is not None and len(fc.keyframe_points) > 0 for fc in fcurves]
+    if not any(present):
+        return False
+    if not all(present):
+        return None
+    keys = [_read_keys(fc) for fc in fcurves]
+    frames = keys[0][0][:, 0]
+    if any(len(k[0]) != len(frames) or not np.allclose(k[0][:, 0], frames) for k in keys):
+        return None
+    mask = (frames >= frame_start) & (frames <= frame_end)
+    if not mask.any():
+        return False
+
+    q = np.stack([k[0][mask, 1] for k in keys], axis=1)
+    dw, dx, dy, dz = delta_quat
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    rotated = np.stack([
+        dw * w - dx * x - dy * y - dz * z,
+        dw * x + dx * w + dy * z - dz * y,
+        dw * y - dx * z + dy * w + dz * x,
+        dw * z + dx * y - dy * x + dz * w,
+    ], axis=1)
+
+    for i, (fc, (co, left, right)) in enumerate(zip(fcurves, keys)):
+        shift = rotated[:, i] - co[mask, 1]
+        co[mask, 1] += shift
+        left[mask, 1] += shift
+        right[mask, 1] += shift
+        _write_keys(fc, co, left, right)
+    return True
+
+def apply_pose_delta_to_range(arm, bone, orig_location, orig_rotation, frame_start, frame_end):
+    """Przenosi różnicę między oryginalną a bieżącą pozą kości na istniejące klucze w zakresie.
+
+    Zwraca (changed, skipped); skipped = rotacji nie dało się zapisać w kluczach
+    (klucze Euler przy obrocie kwaternionem albo kanały W/X/Y/Z na różnych klatkach).
+    """
+    action = arm.animation_data.action if arm.animation_data else None
+    if action is None:
+        return False, False
+
+    changed = False
+    skipped = False
+    if orig_location is not None:
+        loc_delta = bone.location - orig_location
+        if loc_delta.length > 1e-7:
+            path = bone.path_from_id("location")
+            for i in range(3):
+                changed |= offset_fcurve_range(action.fcurves.find(path, index=i), loc_delta[i], frame_start, frame_end)
+
+    if isinstance(orig_rotation, mathutils.Quaternion) and bone.rotation_mode == 'QUATERNION':
+        delta_quat = bone.rotation_quaternion @ orig_rotation.inverted()
+        if delta_quat.angle > 1e-6:
+            path = bone.path_from_id("rotation_quaternion")
+            fcurves = [action.fcurves.find(path, index=i) for i in range(4)]
+            rotated = rotate_quaternion_range(fcurves, delta_quat, frame_start, frame_end)
+            if rotated is None:
+                skipped = True
+            elif rotated:
+                changed = True
+            else:
+                euler_path = bone.path_from_id("rotation_euler")
+                skipped = any(action.fcurves.find(euler_path, index=i) for i in range(3))
+    elif isinstance(orig_rotation, mathutils.Euler) and bone.rotation_mode == orig_rotation.order:
+        path = bone.path_from_id("rotation_euler")
+        for i in range(3):
+            rot_delta = bone.rotation_euler[i] - orig_rotation[i]
+            if abs(rot_delta) > 1e-7:
+                changed |= offset_fcurve_range(action.fcurves.find(path, index=i), rot_delta, frame_start, frame_end)
+
+    return changed, skipped
+
+def report_skipped_bones(operator, skipped):
+    if skipped:
+        names = ", ".join(skipped[:8]) + (" ..." if len(skipped) > 8 else "")
+        operator.report({'WARNING'}, f"Rotation keys not updated for {len(skipped)} bones "
+                                     f"(Euler keys or W/X/Y/Z on different frames): {names}")
+
+MOVE_CHANNELS = (("location", 3), ("rotation_quaternion", 4), ("rotation_euler", 3), ("scale", 3))
+ROTATE_CHANNELS = (("rotation_quaternion", 4),)
+
+_drag_undo = []
+_drag_redo = []
+
+def _match_frames(xs, frames):
+    # Indeks klucza na danej klatce albo -1
+    idx = np.full(len(frames), -1, dtype=np.int64)
+    if not len(xs):
+        return idx
+    pos = np.minimum(np.searchsorted(xs, frames - 1e-3), len(xs) - 1)
+    hit = np.abs(xs[pos] - frames) < 1e-3
+    idx[hit] = pos[hit]
+    return idx
+
+def _channel_rows(fcurve, frames):
+    # Wiersz na klatkę: wartość, handle_left (x, y), handle_right (x, y); NaN = brak klucza
+    rows = np.full((len(frames), 5), np.nan, dtype=np.float32)
+    if fcurve is None or not len(fcurve.keyframe_points):
+        return rows
+    co, left, right = _read_keys(fcurve)
+    idx = _match_frames(co[:, 0], frames)
+    hit = idx >= 0
+    rows[hit, 0] = co[idx[hit], 1]
+    rows[hit, 1:3] = left[idx[hit]]
+    rows[hit, 3:5] = right[idx[hit]]
+    return rows
+
+def _restore_channel(action, data_path, index, group, frames, rows):
+    present = ~np.isnan(rows[:, 0])
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        if not present.any():
+            return
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+
+    co, _, _ = _read_keys(fcurve)
+    idx = _match_frames(co[:, 0], frames)
+    for i in sorted(idx[~present & (idx >= 0)], reverse=True):
+        fcurve.keyframe_points.remove(fcurve.keyframe_points[int(i)], fast=True)
+    for frame in frames[present & (idx < 0)]:
+        fcurve.keyframe_points.insert(float(frame), 0.0, options={'FAST'})
+
+    if not len(fcurve.keyframe_points):
+        action.fcurves.remove(fcurve)
+        return
+
+    co, left, right = _read_keys(fcurve)
+    idx = _match_frames(co[:, 0], frames)
+    hit = present & (idx >= 0)
+    co[idx[hit], 1] = rows[hit, 0]
+    left[idx[hit]] = rows[hit, 1:3]
+    right[idx[hit]] = rows[hit, 3:5]
+    _write_keys(fcurve, co, left, right)
+
+def _bone_state(bone):
+    return (bone.rotation_mode, tuple(bone.location), tuple(bone.rotation_quaternion), tuple(bone.rotation_euler))
+
+def _apply_bone_state(bone, state):
+    mode, location, quaternion, euler = state
+    bone.rotation_mode = mode
+    bone.location = location
+    bone.rotation_quaternion = quaternion
+    bone.rotation_euler = euler
+
+def capture_pose_states(arms):
+    return {(arm.name, b.name): _bone_state(b) for arm in arms for b in arm.pose.bones}
+
+def affected_bones(arms, affected):
+    # Kości, które modal faktycznie przesunął/obrócił (waga > 0 albo zaznaczone poza promieniem)
+    return [(arm, b) for arm in arms for b in arm.pose.bones if (arm.name, b.name) in affected]
+
+class PoseDragDiff:
+    """Zmiany jednego przeciągnięcia: transformacje zmienionych kości i klucze w dotkniętych klatkach."""
+
+    def __init__(self, label, orig_states):
+        self.label = label
+        self.orig_states = orig_states
+        self.bones = []
+        self.channels = []
+        self._pending = []
+
+    def begin(self, bones, channels, frame_start, frame_end):
+        for arm, bone in bones:
+            action = arm.animation_data.action if arm.animation_data else None
+            fcurves = []
+            for prop, size in channels:
+                data_path = bone.path_from_id(prop)
+                for index in range(size):
+                    fc = action.fcurves.find(data_path, index=index) if action else None
+                    fcurves.append((data_path, index, fc))
+
+            if frame_start == frame_end:
+                frames = np.array([frame_start], dtype=np.float32)
+            else:
+                found = []
+                for _, _, fc in fcurves:
+                    if fc is not None and len(fc.keyframe_points):
+                        xs = _read_keys(fc)[0][:, 0]
+                        found.append(xs[(xs >= frame_start) & (xs <= frame_end)])
+                if not found:
+                    continue
+                frames = np.unique(np.concatenate(found))
+
+            for data_path, index, fc in fcurves:
+                self._pending.append((arm.name, bone.name, data_path, index, frames, _channel_rows(fc, frames)))
+
+    def finish(self):
+        for arm_name, bone_name, data_path, index, frames, before in self._pending:
+            arm = bpy.data.objects.get(arm_name)
+            action = arm.animation_data.action if arm and arm.animation_data else None
+            fc = action.fcurves.find(data_path, index=index) if action else None
+            after = _channel_rows(fc, frames)
+            if not np.array_equal(before, after, equal_nan=True):
+                self.channels.append((arm_name, data_path, index, bone_name, frames, before, after))
+        self._pending = []
+
+        for (arm_name, bone_name), before in self.orig_states.items():
+            arm = bpy.data.objects.get(arm_name)
+            bone = arm.pose.bones.get(bone_name) if arm else None
+            if bone is not None and _bone_state(bone) != before:
+                self.bones.append((arm_name, bone_name, before, _bone_state(bone)))
+        self.orig_states = None
+
+    def is_empty(self):
+        return not self.bones and not self.channels
+
+    def apply(self, after):
+        for arm_name, data_path, index, group, frames, before_rows, after_rows in self.channels:
+            arm = bpy.data.objects.get(arm_name)
+            if arm is None:
+                continue
+            if arm.animation_data is None:
+                arm.animation_data_create()
+            action = arm.animation_data.action
+            if action is None:
+                continue
+            _restore_channel(action, data_path, index, group, frames, after_rows if after else before_rows)
+
+        for arm_name, bone_name, before, after_state in self.bones:
+            arm = bpy.data.objects.get(arm_name)
+            bone = arm.pose.bones.get(bone_name) if arm else None
+            if bone is not None:
+                _apply_bone_state(bone, after_state if after else before)
+            if arm is not None:
+                arm.update_tag()
+
+def push_drag_diff(diff, limit):
+    if diff.is_empty():
+        return
+    _drag_undo.append(diff)
+    del _drag_undo[:-limit]
+    _drag_redo.clear()
+
+@bpy.app.handlers.persistent
+def clear_drag_history(*args):
+    # Po wczytaniu pliku zapisane diffy opisują już nieaktualny stan
+    _drag_undo.clear()
+    _drag_redo.clear()
+
+FALLOFF_LUT_SIZE = 512
+FALLOFF_CURVE_GROUP = ".GUI_PatryCCio_Falloff"
+
+_falloff_cache = {"key": None, "lut": None}
+
+def get_falloff_curve_node(create=True):
+    # CurveMapping nie da się zadeklarować jako property, trzymamy ją w ukrytym node'zie
+    group = bpy.data.node_groups.get(FALLOFF_CURVE_GROUP)
+    if group is None:
+        if not create:
+            return None
+        group = bpy.data.node_groups.new(FALLOFF_CURVE_GROUP, 'ShaderNodeTree')
+        group.use_fake_user = True
+    node = next((n for n in group.nodes if n.type == 'FLOAT_CURVE'), None)
+    if node is None and create:
+        node = group.nodes.new('ShaderNodeFloatCurve')
+    return node
+
+def _sample_falloff(falloff_type, exponent, t):
+    # t = 1 - dist / radius; wykładnik (Smoothness) dotyczy tylko profilu liniowego -
+    # profile nazwane mają stały kształt
+    if falloff_type == 'SMOOTH':
+        return t * t * (3.0 - 2.0 * t)
+    elif falloff_type == 'SPHERE':
+        return np.sqrt(t * (2.0 - t))
+    elif falloff_type == 'INVERSE_SQUARE':
+        return t * (2.0 - t)
+    elif falloff_type == 'CONSTANT':
+        return np.ones_like(t)
+    elif falloff_type == 'CURVE' and get_falloff_curve_node(create=False):
+        mapping = get_falloff_curve_node(create=False).mapping
+        mapping.initialize()
+        curve = mapping.curves[0]
+        return np.clip(np.array([mapping.evaluate(curve, float(x)) for x in t]), 0.0, 1.0)
+    return t ** exponent
+
+def _falloff_key(props):
+    key = (props.falloff_type, round(props.falloff_exponent, 6) if props.falloff_type == 'LINEAR' else None)
+    node = get_falloff_curve_node(create=False) if props.falloff_type == 'CURVE' else None
+    if node:
+        curve = node.mapping.curves[0]
+        key += tuple((p.location[0], p.location[1], p.handle_type) for p in curve.points)
+    return key
+
+def falloff_lut(props):
+    """Tablica wag falloffa indeksowana po dist / radius, przeliczana tylko po zmianie parametrów."""
+    key = _falloff_key(props)
+    if _falloff_cache["key"] != key:
+        u = np.linspace(0.0, 1.0, FALLOFF_LUT_SIZE)
+        _falloff_cache["lut"] = _sample_falloff(props.falloff_type, props.falloff_exponent, 1.0 - u)
+        _falloff_cache["key"] = key
+    return _falloff_cache["lut"]
+
+def falloff_weight(props, dist, floor=0.003, invert=False, lut=None):
+    # lut: wynik falloff_lut(props) pobrany raz na zdarzenie - pętle po kościach
+    # nie powinny przeliczać klucza krzywej dla każdej kości
+    if dist >= props.radius:
+        return 0.0
+    u = dist / props.radius
+    if invert:
+        u = 1.0 - u
+    if lut is None:
+        lut = falloff_lut(props)
+    return max(floor, float(lut[int(u * (FALLOFF_LUT_SIZE - 1) + 0.5)]))
+
+def draw_falloff_overlay(context):
+    props = context.scene.prop_move_props
+    if not props.use_proportional:
+        return
+
+    rv3d = context.region_data
+    if rv3d is None:
+        return
+
+    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+
+    center = mathutils.Vector((0, 0, 0))
+    total = 0
+    arms = [obj for obj in bpy.context.selected_objects if obj.type == 'ARMATURE']
+
+    for arm in arms:
+        selected = [b for b in arm.pose.bones if b.bone.select]
+        active = arm.pose.bones.get(arm.data.bones.active.name) if arm.data.bones.active else None
+        if props.use_active_as_center and active:
+            center = arm.matrix_world @ active.head
+            break
+        elif selected:
+            for b in selected:
+                center += arm.matrix_world @ b.head
+                total += 1
+            if total > 0:
+                center /= total
+
+    def draw_ring(center, radius, color, segments=64):
+        verts = []
+        for i in range(segments):
+            angle = 2 * math.pi * i / segments
+            x = radius * math.cos(angle)
+            y = radius * math.sin(angle)
+            point = center + rv3d.view_rotation @ mathutils.Vector((x, y, 0))
+            verts.append(point)
+        batch = batch_for_shader(shader, 'LINE_LOOP', {"pos": verts})
+        shader.bind()
+        shader.uniform_float("color", color)
+        batch.draw(shader)
+
+    def weight_to_color(weight):
+        # Red (1.0) → Yellow (0.5) → Green (0.0)
+        if weight > 0.5:
+            t = (weight - 0.5) * 2
+            return (1.0, 1.0 * (1 - t), 0.0, 0.5)
+        else:
+            t = weight * 2
+            return (t, 1.0, 0.0, 0.5)
+
+    # Rysuj warstwy falloffa
+    layers = 8  # Liczba warstw gradientu
+    lut = falloff_lut(props)
+    for i in range(1, layers + 1):
+        frac = i / layers
+        dist = props.radius * frac
+        weight = falloff_weight(props, dist, floor=0.0, lut=lut)
+        color = weight_to_color(weight)
+        draw_ring(center, dist, color)
+
+    # Rysuj zewnętrzny kontur radius jako cienką białą linię
+    draw_ring(center, props.radius, (1.0, 1.0, 1.0, 0.8))
 
 class POSE_OT_proportional_move_modal(bpy.types.Operator):
     bl_idname = "pose.proportional_move_modal"
     bl_label = "Proportional Move (Interactive)"
-    bl_options = {'REGISTER', 'UNDO', 'GRAB_CURSOR', 'BLOCKING'}
+    bl_options = {'REGISTER', 'GRAB_CURSOR', 'BLOCKING'}
 
     _draw_handle = None
     _start_mouse = None
     _orig_positions = {}
 
-    def draw_circle(self, context):
-        props = context.scene.prop_move_props
-        if not props.use_proportional:
-            return
-
-        region = context.region
-        rv3d = context.region_data
-        if rv3d is None:
-            return
-
-        shader = gpu.shader.from_builtin('UNIFORM_COLOR')
-
-        center = mathutils.Vector((0, 0, 0))
-        total = 0
-        arms = [obj for obj in bpy.context.selected_objects if obj.type == 'ARMATURE']
-
-        for arm in arms:
-            selected = [b for b in arm.pose.bones if b.bone.select]
-            active = arm.pose.bones.get(arm.data.bones.active.name) if arm.data.bones.active else None
-            if props.use_active_as_center and active:
-                center = arm.matrix_world @ active.head
-                break
-            elif selected:
-                for b in selected:
-                    center += arm.matrix_world @ b.head
-                    total += 1
-                if total > 0:
-                    center /= total
-
-        def draw_ring(center, radius, color, segments=64):
-            verts = []
-            for i in range(segments):
-                angle = 2 * math.pi * i / segments
-                x = radius * math.cos(angle)
-                y = radius * math.sin(angle)
-                point = center + rv3d.view_rotation @ mathutils.Vector((x, y, 0))
-                verts.append(point)
-            batch = batch_for_shader(shader, 'LINE_LOOP', {"pos": verts})
-            shader.bind()
-            shader.uniform_float("color", color)
-            batch.draw(shader)
-
-        def weight_to_color(weight):
-            # Red (1.0) → Yellow (0.5) → Green (0.0)
-            if weight > 0.5:
-                t = (weight - 0.5) * 2
-                return (1.0, 1.0 * (1 - t), 0.0, 0.5)
-            else:
-                t = weight * 2
-                return (t, 1.0, 0.0, 0.5)
-
-        # Włącz blending (opcjonalne w Blenderze 4.4)
-        # bgl.glEnable(bgl.GL_BLEND)
-
-        # Rysuj warstwy falloffa
-        layers = 8  # Liczba warstw gradientu
-        for i in range(1, layers + 1):
-            frac = i / layers
-            dist = props.radius * frac
-            weight = max(0.0, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
-            color = weight_to_color(weight)
-            draw_ring(center, dist, color)
-
-        # Rysuj zewnętrzny kontur radius jako cienką białą linię
-        draw_ring(center, props.radius, (1.0, 1.0, 1.0, 0.8))
-
     def apply_rotation_towards(self, bone, move_vec_local, weight):
         if bone.rotation_mode != 'QUATERNION':
             bone.rotation_mode = 'QUATERNION'
@@ -147,17 +506,34 @@ class POSE_OT_proportional_move_modal(bpy.types.Operator):
             return {'CANCELLED'}
 
         elif event.type == 'LEFTMOUSE':
-            for arm in arms:
-                for bone in arm.pose.bones:
-                    bone.keyframe_insert(data_path="location", frame=context.scene.frame_current)
+            diff = PoseDragDiff("Proportional Move", self._orig_states)
+            bones = affected_bones(arms, self._affected)
+            if props.apply_to_range:
+                diff.begin(bones, MOVE_CHANNELS, props.range_start, props.range_end)
+                skipped = []
+                for arm, bone in bones:
+                    if bone.name in self._orig_positions:
+                        _, failed = apply_pose_delta_to_range(arm, bone, self._orig_positions[bone.name],
+                                                              self._orig_rotations.get(bone.name),
+                                                              props.range_start, props.range_end)
+                        if failed:
+                            skipped.append(bone.name)
+                report_skipped_bones(self, skipped)
+            else:
+                frame = context.scene.frame_current
+                diff.begin(bones, MOVE_CHANNELS, frame, frame)
+                for arm, bone in bones:
+                    bone.keyframe_insert(data_path="location", frame=frame)
 
                     # Dodajemy warunek dla rotacji
                     if bone.rotation_mode == 'QUATERNION':
-                        bone.keyframe_insert(data_path="rotation_quaternion", frame=context.scene.frame_current)
+                        bone.keyframe_insert(data_path="rotation_quaternion", frame=frame)
                     else:
-                        bone.keyframe_insert(data_path="rotation_euler", frame=context.scene.frame_current)
+                        bone.keyframe_insert(data_path="rotation_euler", frame=frame)
 
-                    bone.keyframe_insert(data_path="scale", frame=context.scene.frame_current)
+                    bone.keyframe_insert(data_path="scale", frame=frame)
+            diff.finish()
+            push_drag_diff(diff, props.undo_steps)
 
             props.state_shortcut = 0
             props.invert_falloff = False
@@ -203,6 +579,7 @@ class POSE_OT_proportional_move_modal(bpy.types.Operator):
                             center /= total
 
             self._center = center
+            lut = falloff_lut(props)
             for arm, b in all_bones:
                 if b.name not in self._orig_positions:
                     continue
@@ -215,15 +592,18 @@ class POSE_OT_proportional_move_modal(bpy.types.Operator):
                 if props.affect_selected_only:
                     if b == arm.pose.bones.get(arm.data.bones.active.name):
                         b.location += move_vec_local * 0.05
+                        self._affected.add((arm.name, b.name))
                     elif b.bone.select:
                         if dist < props.radius:
                             if props.simulation_cloth and props.invert_falloff:
-                                weight = max(0.003, ((dist) / props.radius) ** props.falloff_exponent)
-                                weight2 = max(0.003, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
+                                weight = falloff_weight(props, dist, invert=True, lut=lut)
+                                weight2 = falloff_weight(props, dist, lut=lut)
                                 b.location += move_vec_local * weight2 * 0.05
+                                self._affected.add((arm.name, b.name))
                             else:
-                                weight = max(0.003, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
+                                weight = falloff_weight(props, dist, lut=lut)
                                 b.location += move_vec_local * weight * 0.05
+                                self._affected.add((arm.name, b.name))
 
 
                             if props.simulation_cloth and b.name in self._orig_rotations:
@@ -238,12 +618,14 @@ class POSE_OT_proportional_move_modal(bpy.types.Operator):
                 else:
                     if dist < props.radius:
                         if props.simulation_cloth and props.invert_falloff:
-                            weight = max(0.003, ((dist) / props.radius) ** props.falloff_exponent)
-                            weight2 = max(0.003, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
+                            weight = falloff_weight(props, dist, invert=True, lut=lut)
+                            weight2 = falloff_weight(props, dist, lut=lut)
                             b.location += move_vec_local * weight2 * 0.05
+                            self._affected.add((arm.name, b.name))
                         else:
-                            weight = max(0.003, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
+                            weight = falloff_weight(props, dist, lut=lut)
                             b.location += move_vec_local * weight * 0.05
+                            self._affected.add((arm.name, b.name))
                         
 
                         if props.simulation_cloth and b.name in self._orig_rotations:
@@ -256,6 +638,7 @@ class POSE_OT_proportional_move_modal(bpy.types.Operator):
                                 
                     elif b.bone.select:
                         b.location += move_vec_local
+                        self._affected.add((arm.name, b.name))
 
                         if props.simulation_cloth and b.name in self._orig_rotations:
                             # Przywracanie rotacji poza promieniem
@@ -357,6 +740,8 @@ class POSE_OT_proportional_move_modal(bpy.types.Operator):
             return {'CANCELLED'}
 
         self._start_mouse = (event.mouse_region_x, event.mouse_region_y)
+        self._orig_states = capture_pose_states(arms)
+        self._affected = set()
         self._orig_positions = {}
         self._orig_rotations = {}
 
@@ -372,77 +757,18 @@ class POSE_OT_proportional_move_modal(bpy.types.Operator):
                     self._orig_rotations[b.name] = b.rotation_euler.copy()  # Zapisz rotację Euler
 
         context.window_manager.modal_handler_add(self)
-        self._draw_handle = bpy.types.SpaceView3D.draw_handler_add(self.draw_circle, (context,), 'WINDOW', 'POST_VIEW')
+        self._draw_handle = bpy.types.SpaceView3D.draw_handler_add(draw_falloff_overlay, (context,), 'WINDOW', 'POST_VIEW')
         return {'RUNNING_MODAL'}
 
 class POSE_OT_proportional_rotate_modal(bpy.types.Operator):
     bl_idname = "pose.proportional_rotate_modal"
     bl_label = "Proportional Rotate (Interactive)"
-    bl_options = {'REGISTER', 'UNDO', 'BLOCKING'}
+    bl_options = {'REGISTER', 'BLOCKING'}
 
     _start_mouse = None
     _orig_rotations = {}
     _draw_handle = None
 
-    def draw_circle(self, context):
-        props = context.scene.prop_move_props
-        if not props.use_proportional:
-            return
-
-        region = context.region
-        rv3d = context.region_data
-        if rv3d is None:
-            return
-
-        shader = gpu.shader.from_builtin('UNIFORM_COLOR')
-        center = mathutils.Vector((0, 0, 0))
-        total = 0
-        arms = [obj for obj in bpy.context.selected_objects if obj.type == 'ARMATURE']
-
-        for arm in arms:
-            selected = [b for b in arm.pose.bones if b.bone.select]
-            active = arm.pose.bones.get(arm.data.bones.active.name) if arm.data.bones.active else None
-            if props.use_active_as_center and active:
-                center = arm.matrix_world @ active.head
-                break
-            elif selected:
-                for b in selected:
-                    center += arm.matrix_world @ b.head
-                    total += 1
-                if total > 0:
-                    center /= total
-
-        def draw_ring(center, radius, color, segments=64):
-            verts = []
-            for i in range(segments):
-                angle = 2 * math.pi * i / segments
-                x = radius * math.cos(angle)
-                y = radius * math.sin(angle)
-                point = center + rv3d.view_rotation @ mathutils.Vector((x, y, 0))
-                verts.append(point)
-            batch = batch_for_shader(shader, 'LINE_LOOP', {"pos": verts})
-            shader.bind()
-            shader.uniform_float("color", color)
-            batch.draw(shader)
-
-        def weight_to_color(weight):
-            if weight > 0.5:
-                t = (weight - 0.5) * 2
-                return (1.0, 1.0 * (1 - t), 0.0, 0.5)
-            else:
-                t = weight * 2
-                return (t, 1.0, 0.0, 0.5)
-
-        layers = 8
-        for i in range(1, layers + 1):
-            frac = i / layers
-            dist = props.radius * frac
-            weight = max(0.0, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
-            color = weight_to_color(weight)
-            draw_ring(center, dist, color)
-
-        draw_ring(center, props.radius, (1.0, 1.0, 1.0, 0.8))
-
     def modal(self, context, event):
         props = context.scene.prop_move_props
         arms = [obj for obj in bpy.context.selected_objects if obj.type == 'ARMATURE']
@@ -460,9 +786,25 @@ class POSE_OT_proportional_rotate_modal(bpy.types.Operator):
             return {'CANCELLED'}
 
         elif event.type == 'LEFTMOUSE':
-            for arm in arms:
-                for bone in arm.pose.bones:
-                    bone.keyframe_insert(data_path="rotation_quaternion", frame=context.scene.frame_current)
+            diff = PoseDragDiff("Proportional Rotate", self._orig_states)
+            bones = affected_bones(arms, self._affected)
+            if props.apply_to_range:
+                diff.begin(bones, ROTATE_CHANNELS, props.range_start, props.range_end)
+                skipped = []
+                for arm, bone in bones:
+                    if bone.name in self._orig_rotations:
+                        _, failed = apply_pose_delta_to_range(arm, bone, None, self._orig_rotations[bone.name],
+                                                              props.range_start, props.range_end)
+                        if failed:
+                            skipped.append(bone.name)
+                report_skipped_bones(self, skipped)
+            else:
+                frame = context.scene.frame_current
+                diff.begin(bones, ROTATE_CHANNELS, frame, frame)
+                for arm, bone in bones:
+                    bone.keyframe_insert(data_path="rotation_quaternion", frame=frame)
+            diff.finish()
+            push_drag_diff(diff, props.undo_steps)
             bpy.types.SpaceView3D.draw_handler_remove(self._draw_handle, 'WINDOW')
             self._draw_handle = None
             return {'FINISHED'}
@@ -495,6 +837,7 @@ class POSE_OT_proportional_rotate_modal(bpy.types.Operator):
                         if total > 0:
                             center /= total
 
+            lut = falloff_lut(props)
             for arm, b in all_bones:
                 if b.name not in self._orig_rotations:
                     continue
@@ -514,14 +857,16 @@ class POSE_OT_proportional_rotate_modal(bpy.types.Operator):
                 if props.affect_selected_only:
                     if b.bone.select or b == arm.pose.bones.get(arm.data.bones.active.name):
                         if dist < props.radius:
-                            weight = max(0.003, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
+                            weight = falloff_weight(props, dist, lut=lut)
                             rot_quat = mathutils.Quaternion(bone_local_rot_axis, angle * weight)
                             b.rotation_quaternion = rot_quat @ b.rotation_quaternion
+                            self._affected.add((arm.name, b.name))
                 else:
                     if dist < props.radius:
-                        weight = max(0.003, ((props.radius - dist) / props.radius) ** props.falloff_exponent)
+                        weight = falloff_weight(props, dist, lut=lut)
                         rot_quat = mathutils.Quaternion(bone_local_rot_axis, angle * weight)
                         b.rotation_quaternion = rot_quat @ b.rotation_quaternion
+                        self._affected.add((arm.name, b.name))
 
         # Obsługa klawiszy pomocniczych
         if event.type == 'ONE' and event.value == 'PRESS':
@@ -567,6 +912,7 @@ class POSE_OT_proportional_rotate_modal(bpy.types.Operator):
             return {'CANCELLED'}
 
         self._start_mouse = (event.mouse_region_x, event.mouse_region_y)
+        self._affected = set()
         self._orig_rotations = {}
 
         for arm in arms:
@@ -575,11 +921,57 @@ class POSE_OT_proportional_rotate_modal(bpy.types.Operator):
                     b.rotation_mode = 'QUATERNION'
                 self._orig_rotations[b.name] = b.rotation_quaternion.copy()
 
+        # Stan po przełączeniu na kwaterniony - diff zapisze tylko kości obrócone przeciągnięciem
+        self._orig_states = capture_pose_states(arms)
+
         context.window_manager.modal_handler_add(self)
-        self._draw_handle = bpy.types.SpaceView3D.draw_handler_add(self.draw_circle, (context,), 'WINDOW', 'POST_VIEW')
+        self._draw_handle = bpy.types.SpaceView3D.draw_handler_add(draw_falloff_overlay, (context,), 'WINDOW', 'POST_VIEW')
         return {'RUNNING_MODAL'}
 
 
+class POSE_OT_proportional_falloff_curve(bpy.types.Operator):
+    bl_idname = "pose.proportional_falloff_curve"
+    bl_label = "Create Falloff Curve"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        get_falloff_curve_node()
+        return {'FINISHED'}
+
+
+class POSE_OT_proportional_undo(bpy.types.Operator):
+    bl_idname = "pose.proportional_undo"
+    bl_label = "Undo Proportional Drag"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'POSE' and bool(_drag_undo)
+
+    def execute(self, context):
+        diff = _drag_undo.pop()
+        diff.apply(after=False)
+        _drag_redo.append(diff)
+        self.report({'INFO'}, f"Undo: {diff.label}")
+        return {'FINISHED'}
+
+class POSE_OT_proportional_redo(bpy.types.Operator):
+    bl_idname = "pose.proportional_redo"
+    bl_label = "Redo Proportional Drag"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'POSE' and bool(_drag_redo)
+
+    def execute(self, context):
+        diff = _drag_redo.pop()
+        diff.apply(after=True)
+        _drag_undo.append(diff)
+        self.report({'INFO'}, f"Redo: {diff.label}")
+        return {'FINISHED'}
+
+
 class POSE_PT_proportional_move(bpy.types.Panel):
     bl_label = "Proportional Move"
     bl_space_type = 'VIEW_3D'
@@ -611,9 +1003,24 @@ class POSE_PT_proportional_move(bpy.types.Panel):
 
             box.prop(props, "radius")
             box.prop(props, "power")
-            box.prop(props, "falloff_exponent", text="Smoothness")
+            box.prop(props, "falloff_type")
+            if props.falloff_type == 'LINEAR':
+                box.prop(props, "falloff_exponent", text="Smoothness")
+            if props.falloff_type == 'CURVE':
+                node = get_falloff_curve_node(create=False)
+                if node:
+                    box.template_curve_mapping(node, "mapping")
+                else:
+                    box.operator("pose.proportional_falloff_curve")
             box.prop(props, "use_active_as_center")
 
+            box4 = box.box()
+            box4.prop(props, "apply_to_range")
+            if props.apply_to_range:
+                row = box4.row(align=True)
+                row.prop(props, "range_start", text="Start")
+                row.prop(props, "range_end", text="End")
+
             if len(arms) == 1:
                 box.prop(props, "affect_selected_only")
             if props.state_shortcut == 1:
@@ -621,9 +1028,17 @@ class POSE_PT_proportional_move(bpy.types.Panel):
                 if props.simulation_cloth:
                     box.prop(props, "invert_falloff")
 
+            box5 = box.box()
+            row = box5.row(align=True)
+            row.operator("pose.proportional_undo", text=f"Undo ({len(_drag_undo)})", icon='LOOP_BACK')
+            row.operator("pose.proportional_redo", text=f"Redo ({len(_drag_redo)})", icon='LOOP_FORWARDS')
+            box5.prop(props, "undo_steps")
+
             box2 = box.box()
             box2.label(text="CTRL + G - Proportional move")
             box2.label(text="CTRL + R - Proportional rotate")
+            box2.label(text="CTRL + ALT + Z - Undo drag")
+            box2.label(text="CTRL + ALT + SHIFT + Z - Redo drag")
             box2.label(text="1 - Set radius mode")
             box2.label(text="2 - Set falloff mode")
             box2.label(text="3 - Set power mode")
@@ -642,6 +1057,7 @@ def register():
     bpy.types.Scene.prop_move_props = bpy.props.PointerProperty(type=ProportionalMoveProps)
     bpy.utils.register_class(POSE_OT_proportional_move_modal)
     bpy.utils.register_class(POSE_PT_proportional_move)
+    bpy.utils.register_class(POSE_OT_proportional_falloff_curve)
 
     wm = bpy.context.window_manager
     km = wm.keyconfigs.addon.keymaps.new(name='Pose', space_type='EMPTY')
@@ -652,6 +1068,15 @@ def register():
     kmi = km.keymap_items.new(POSE_OT_proportional_rotate_modal.bl_idname, 'R', 'PRESS', ctrl=True)
     addon_keymaps.append((km, kmi))
 
+    bpy.utils.register_class(POSE_OT_proportional_undo)
+    bpy.utils.register_class(POSE_OT_proportional_redo)
+    kmi = km.keymap_items.new(POSE_OT_proportional_undo.bl_idname, 'Z', 'PRESS', ctrl=True, alt=True)
+    addon_keymaps.append((km, kmi))
+    kmi = km.keymap_items.new(POSE_OT_proportional_redo.bl_idname, 'Z', 'PRESS', ctrl=True, alt=True, shift=True)
+    addon_keymaps.append((km, kmi))
+
+    bpy.app.handlers.load_post.append(clear_drag_history)
+
 def unregister():
     for km, kmi in addon_keymaps:
         km.keymap_items.remove(kmi)
@@ -662,6 +1087,13 @@ def unregister():
     bpy.utils.unregister_class(POSE_OT_proportional_move_modal)
     bpy.utils.unregister_class(POSE_PT_proportional_move)
     bpy.utils.unregister_class(POSE_OT_proportional_rotate_modal)
+    bpy.utils.unregister_class(POSE_OT_proportional_falloff_curve)
+    bpy.utils.unregister_class(POSE_OT_proportional_undo)
+    bpy.utils.unregister_class(POSE_OT_proportional_redo)
+
+    if clear_drag_history in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_drag_history)
+    clear_drag_history()
 
 if __name__ == "__main__":
     register()
@@ -1,12 +1,27 @@
 import bpy
+import re
+import numpy as np
+import mathutils.kdtree
+import time
+import json
+import struct
+import zipfile
+import zlib
+from bpy_extras.io_utils import ExportHelper, ImportHelper
 
-registered_panels = []
+registered_panels = {}
 shapes = []
 
+# Indeks grup shape keyów aktywnego obiektu - przebudowywany tylko po zmianie nazw kluczy
+_key_index = {"pointer": None, "names": None, "generation": 0}
+_collapsed_groups = set()
+_group_filter_items = []
+
 def create_shape_key_item_panel(group):
     class PT_ShapeKeyItemPanel(bpy.types.Panel):
         bl_label = f'{group}'
-        bl_idname = f'PT_{group.upper()}_SHAPEKEY_PT_PANEL'
+        # "Left Arm" i "Left-Arm" dają ten sam zapis - crc32 pełnej nazwy rozróżnia panele
+        bl_idname = f'PT_{re.sub(r"[^A-Z0-9_]", "_", group.upper())}_{zlib.crc32(group.encode()):08X}_SHAPEKEY_PT_PANEL'
         bl_space_type = 'VIEW_3D'
         bl_region_type = 'UI'
         bl_category = 'GUI PatryCCio'
@@ -51,6 +66,180 @@ def create_shape_key_item_panel(group):
 
     return PT_ShapeKeyItemPanel
 
+def shape_key_index(key):
+    """Grupy, etykiety i kolejność (po grupach) kluczy z cache; przebudowa po zmianie nazw."""
+    pointer = key.as_pointer()
+    if _key_index["pointer"] != pointer or _key_index["names"] is None:
+        names = [block.name for block in key.key_blocks]
+        parsed = [parse_shape_key_name(name) for name in names]
+        groups = sorted(set(group for group, _ in parsed[1:]))
+        group_ids = {group: i for i, group in enumerate(groups)}
+        group_of = [-1] + [group_ids[group] for group, _ in parsed[1:]]
+        order = sorted(range(len(names)), key=lambda i: (group_of[i], i))
+        neworder = [0] * len(names)
+        for position, i in enumerate(order):
+            neworder[i] = position
+
+        _key_index.update(
+            pointer=pointer,
+            names=names,
+            generation=_key_index["generation"] + 1,
+            groups=groups,
+            group_of=group_of,
+            labels=[label for _, label in parsed],
+            neworder=neworder,
+            filters={},
+            search=None,
+        )
+    return _key_index
+
+SEARCH_SPLIT = re.compile(r'[\s_.\-:|/]+')
+SEARCH_WORDS = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+SEARCH_RESULT_ROWS = 40
+
+def search_tokens(name):
+    tokens = set()
+    for part in SEARCH_SPLIT.split(name):
+        if part:
+            tokens.add(part.lower())
+            tokens.update(word.lower() for word in SEARCH_WORDS.findall(part))
+    return tokens
+
+def search_index(index_data):
+    """Trie prefiksów tokenów nazw (węzeł "" = indeksy kluczy pod prefiksem) + indeks tokenów; budowane raz na zestaw nazw."""
+    search = index_data.get("search")
+    if search is None:
+        trie, tokens = {}, {}
+        for i, name in enumerate(index_data["names"]):
+            for token in search_tokens(name):
+                tokens.setdefault(token, []).append(i)
+                node = trie
+                for char in token:
+                    node = node.setdefault(char, {})
+                    node.setdefault("", set()).add(i)
+        search = index_data["search"] = {"trie": trie, "tokens": tokens, "lower": [n.lower() for n in index_data["names"]],
+                                         "results": {}}
+    return search
+
+def search_shape_keys(index_data, query):
+    """Indeksy kluczy pasujących do wszystkich słów zapytania (prefiks tokenu, w ostateczności podciąg) i ich grupy."""
+    search = search_index(index_data)
+    query = query.strip().lower()
+    cached = search["results"].get(query)
+    if cached is not None:
+        return cached
+
+    # Słowa zakończone spacją są pełnymi tokenami (indeks tokenów), ostatnie słowo to prefiks (trie)
+    terms = [term for term in SEARCH_SPLIT.split(query) if term]
+    matches = None
+    for position, term in enumerate(terms):
+        if position < len(terms) - 1 and term in search["tokens"]:
+            found = set(search["tokens"][term])
+        else:
+            node = search["trie"]
+            for char in term:
+                node = node.get(char)
+                if node is None:
+                    break
+            found = set(node[""]) if node is not None else set(
+                i for i, name in enumerate(search["lower"]) if term in name
+            )
+        matches = found if matches is None else matches & found
+        if not matches:
+            break
+
+    keys = sorted(matches or (), key=lambda i: index_data["neworder"][i])
+    groups = sorted(set(index_data["groups"][index_data["group_of"][i]] for i in keys if index_data["group_of"][i] >= 0))
+    if len(search["results"]) > 256:
+        search["results"].clear()
+    cached = search["results"][query] = (keys, groups)
+    return cached
+
+def invalidate_shape_key_index():
+    _key_index["names"] = None
+
+class MESH_UL_grouped_shape_keys(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        index_data = shape_key_index(data)
+        group_id = index_data["group_of"][index]
+        row = layout.row(align=True)
+        row.label(text=index_data["groups"][group_id] if group_id >= 0 else "")
+        row.prop(item, 'value', text=index_data["labels"][index])
+        if item.name in shapes:
+            row.operator("object.remove_shape_key_from_selected", text="", icon="X").shape_key_name = item.name
+        else:
+            row.operator("object.add_shape_key_to_selected", text="", icon="PLUS").shape_key_name = item.name
+
+    def filter_items(self, context, data, propname):
+        index_data = shape_key_index(data)
+        group_filter = context.scene.shape_key_group_filter
+        name_filter = self.filter_name.lower()
+        query = context.scene.shape_key_search.strip().lower()
+        signature = (group_filter, frozenset(_collapsed_groups), name_filter, query,
+                     self.use_filter_invert, self.use_filter_sort_alpha, self.use_filter_sort_reverse)
+
+        cached = index_data["filters"].get(signature)
+        if cached is None:
+            groups = index_data["groups"]
+            visible = set(
+                i for i, group in enumerate(groups)
+                if (group_filter == '__ALL__' and group not in _collapsed_groups) or group == group_filter
+            )
+            found = set(search_shape_keys(index_data, query)[0]) if query else None
+            invert = self.use_filter_invert
+            flags = [
+                self.bitflag_filter_item
+                if (group_id in visible or found is not None) and (found is None or i in found)
+                and (not name_filter or (name_filter in name.lower()) != invert) else 0
+                for i, (group_id, name) in enumerate(zip(index_data["group_of"], index_data["names"]))
+            ]
+            if len(index_data["filters"]) > 64:
+                index_data["filters"].clear()
+            cached = index_data["filters"][signature] = (flags, self.sort_order(index_data))
+        return cached
+
+    def sort_order(self, index_data):
+        # Domyślnie po grupach w kolejności kluczy; alfabetycznie - po nazwie w obrębie grupy
+        if not self.use_filter_sort_alpha and not self.use_filter_sort_reverse:
+            return index_data["neworder"]
+        names, group_of = index_data["names"], index_data["group_of"]
+        if self.use_filter_sort_alpha:
+            order = sorted(range(len(names)), key=lambda i: (group_of[i], names[i].lower(), i))
+        else:
+            order = sorted(range(len(names)), key=lambda i: (group_of[i], i))
+        if self.use_filter_sort_reverse:
+            order.reverse()
+        neworder = [0] * len(names)
+        for position, i in enumerate(order):
+            neworder[i] = position
+        return neworder
+
+def get_group_filter_items(self, context):
+    items = [('__ALL__', "All groups", "")]
+    obj = getattr(context, "object", None)
+    if obj and obj.type == 'MESH' and obj.data.shape_keys:
+        items += [(group, group, "") for group in shape_key_index(obj.data.shape_keys)["groups"]]
+    # Blender wymaga trzymania referencji do dynamicznych itemów
+    _group_filter_items[:] = items
+    return _group_filter_items
+
+def update_shape_key_view(self, context):
+    reset_shape_key_panels.previous_names = None
+    reset_shape_key_panels(context)
+
+class OBJECT_OT_toggle_shape_key_group(bpy.types.Operator):
+    bl_idname = "object.toggle_shape_key_group"
+    bl_label = "Collapse/Expand Shape Key Group"
+
+    group: bpy.props.StringProperty()
+
+    def execute(self, context):
+        if self.group in _collapsed_groups:
+            _collapsed_groups.remove(self.group)
+        else:
+            _collapsed_groups.add(self.group)
+        return {'FINISHED'}
+
 class OBJECT_OT_add_shape_key_to_selected(bpy.types.Operator):
     bl_idname = "object.add_shape_key_to_selected"
     bl_label = "Add Shape Key to Selected"
@@ -114,14 +303,24 @@ class PT_ANIMATOR_PT_PANEL(bpy.types.Panel):
         row.prop(context.scene, 'frame_start', text="Start")
         row.prop(context.scene, 'frame_end', text="End")
 
+        self.draw_inspector(context)
+
         layout.label(text="Create Repeat Animation:")
         layout.prop(context.scene, 'repeat_count', text="Repeat Count")
         layout.prop(context.scene, 'repeat_start', text="Repeat Start Frame")
         layout.prop(context.scene, 'repeat_end', text="Repeat End Frame")
+        layout.prop(context.scene, 'repeat_mode', text="Mode")
+        layout.prop(context.scene, 'repeat_source', text="Source")
 
-        if shapes:
+        if context.scene.repeat_source == 'CHANNELS':
+            row = layout.row(align=True)
+            row.operator("object.create_repeat_animation", text="Repeat Selected Channels")
+            row.operator("object.bake_repeat_animation", text="", icon="KEYINGSET")
+        elif shapes:
             box = layout.box()
-            box.operator("object.create_repeat_animation", text="Create Repeat Animation")
+            row = box.row(align=True)
+            row.operator("object.create_repeat_animation", text="Create Repeat Animation")
+            row.operator("object.bake_repeat_animation", text="", icon="KEYINGSET")
             for shape in shapes:
                 row = box.row()
                 row.label(text=shape)
@@ -129,6 +328,44 @@ class PT_ANIMATOR_PT_PANEL(bpy.types.Panel):
         else:
             layout.label(text="No shape keys selected", icon="ERROR")
 
+    def draw_inspector(self, context):
+        layout = self.layout
+        scene = context.scene
+        obj_t = context.object
+
+        layout.label(text="Inspect Frame:")
+        row = layout.row(align=True)
+        row.prop(scene, 'shape_key_inspect_frame', text="")
+        row.prop(scene, 'shape_key_inspect_only', text="", icon="HIDE_OFF")
+
+        cache = shape_key_value_cache(obj_t, scene)
+        values = shape_key_values_at(obj_t, scene, scene.shape_key_inspect_frame)
+        names = shapes if shapes else cache["names"]
+        if not names:
+            layout.label(text="No animated shape keys", icon="INFO")
+            return
+
+        box = layout.box()
+        blocks = obj_t.data.shape_keys.key_blocks
+        for name in names[:INSPECT_ROWS]:
+            block = blocks.get(name)
+            if block is None:
+                continue
+            value = values.get(name, block.value)
+            span = block.slider_max - block.slider_min or 1.0
+            row = box.row()
+            row.label(text=name)
+            if hasattr(row, "progress"):
+                row.progress(factor=(value - block.slider_min) / span, text=f"{value:.3f}")
+            else:
+                row.label(text=f"{value:.3f}")
+            if name in cache["rows"]:
+                row = box.row()
+                row.scale_y = 0.6
+                row.label(text=sparkline(cache["values"][cache["rows"][name]], block.slider_min, block.slider_max))
+        if len(names) > INSPECT_ROWS:
+            box.label(text=f"... {len(names) - INSPECT_ROWS} more")
+
 class PT_KEYS_PT_PANEL(bpy.types.Panel):
     bl_label = "Keys"
     bl_idname = 'PT_KEYS_PT_PANEL'
@@ -146,6 +383,54 @@ class PT_KEYS_PT_PANEL(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         layout.scale_y = 1.4
+        layout.prop(context.scene, 'shape_key_view', expand=True)
+        row = layout.row(align=True)
+        row.prop(context.scene, 'shape_key_mirror_tolerance', text="Tolerance")
+        row.operator("object.mirror_shape_keys", text="Mirror Selected" if shapes else "Mirror Active", icon="MOD_MIRROR")
+
+        obj_t = context.object
+        key = obj_t.data.shape_keys
+        index_data = shape_key_index(key)
+        layout.prop(context.scene, 'shape_key_search', text="", icon="VIEWZOOM")
+
+        if context.scene.shape_key_view != 'LIST':
+            if context.scene.shape_key_search.strip():
+                self.draw_search_results(context, key, index_data)
+            return
+
+        row = layout.row(align=True)
+        row.prop(context.scene, 'shape_key_group_filter', text="")
+        row.prop(context.scene, 'shape_key_list_rows', text="Rows")
+
+        if context.scene.shape_key_group_filter == '__ALL__' and index_data["groups"]:
+            flow = layout.grid_flow(columns=3, align=True)
+            for group in index_data["groups"]:
+                collapsed = group in _collapsed_groups
+                flow.operator(
+                    "object.toggle_shape_key_group", text=group,
+                    icon='DISCLOSURE_TRI_RIGHT' if collapsed else 'DISCLOSURE_TRI_DOWN',
+                    depress=not collapsed
+                ).group = group
+
+        layout.template_list(
+            "MESH_UL_grouped_shape_keys", "", key, "key_blocks", obj_t, "active_shape_key_index",
+            rows=context.scene.shape_key_list_rows
+        )
+
+    def draw_search_results(self, context, key, index_data):
+        keys, groups = search_shape_keys(index_data, context.scene.shape_key_search)
+        box = self.layout.box()
+        box.label(text=f"{len(keys)} keys" + (f" in {', '.join(groups[:6])}" if groups else ""))
+        for i in keys[:SEARCH_RESULT_ROWS]:
+            name = index_data["names"][i]
+            row = box.row()
+            row.prop(key.key_blocks[i], 'value', text=name)
+            if name in shapes:
+                row.operator("object.remove_shape_key_from_selected", text="", icon="X").shape_key_name = name
+            else:
+                row.operator("object.add_shape_key_to_selected", text="", icon="PLUS").shape_key_name = name
+        if len(keys) > SEARCH_RESULT_ROWS:
+            box.label(text=f"... {len(keys) - SEARCH_RESULT_ROWS} more")
 
 class PT_ShapeKeyPanel(bpy.types.Panel):
     bl_label = 'Shape Keys'
@@ -168,11 +453,16 @@ class PT_ShapeKeyPanel(bpy.types.Panel):
         if obj_t and obj_t.type == 'MESH' and not obj_t.data.shape_keys:
             layout.label(text="No shape keys found", icon="ERROR")
 
+        row = layout.row(align=True)
+        row.operator("object.export_shape_keys", text="Export", icon="EXPORT")
+        row.operator("object.import_shape_keys", text="Import", icon="IMPORT")
+
 class OBJECT_OT_create_shape_key_panels(bpy.types.Operator):
     bl_idname = "object.create_shape_key_panels"
     bl_label = "Create Shape Key Panels"
 
     def execute(self, context):
+        reset_shape_key_panels.previous_names = None
         reset_shape_key_panels(context)
         return {'FINISHED'}
 
@@ -195,51 +485,1182 @@ class OBJECT_OT_change_frame(bpy.types.Operator):
 
 def change_frame(scene, direction):
     frames = scene.frame_change_amount
-    if direction == 'FORWARD':
-        scene.frame_current += frames
+    if direction == 'BACKWARD':
+        frames = -frames
+    # W trybie podglądu przesuwamy tylko klatkę odczytu z cache - bez przeliczania sceny
+    if scene.shape_key_inspect_only:
+        scene.shape_key_inspect_frame += frames
     else:
-        scene.frame_current -= frames
+        scene.frame_current += frames
 
 class OBJECT_OT_create_repeat_animation(bpy.types.Operator):
     bl_idname = "object.create_repeat_animation"
     bl_label = "Create Repeat Animation"
     bl_options = {'REGISTER', 'UNDO'}
 
+    use_selected_channels: bpy.props.BoolProperty(
+        name="Selected Channels",
+        description="Repeat the channels selected in the dopesheet instead of the shape key list",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
+
     def execute(self, context):
-        create_repeat_animation(context)
+        source = 'CHANNELS' if self.use_selected_channels else context.scene.repeat_source
+        if not create_repeat_animation(context, source):
+            self.report({'WARNING'}, "No animated channels to repeat")
+            return {'CANCELLED'}
         return {'FINISHED'}
 
-def create_repeat_animation(context):
+KEY_VECTOR_ATTRS = ("co", "handle_left", "handle_right")
+KEY_FLOAT_ATTRS = ("back", "amplitude", "period")
+KEY_ENUM_ATTRS = ("interpolation", "easing", "handle_left_type", "handle_right_type", "type")
+
+def read_keyframes(fcurve):
+    points = fcurve.keyframe_points
+    count = len(points)
+    data = {}
+    for attr in KEY_VECTOR_ATTRS:
+        values = np.empty(count * 2, dtype=np.float32)
+        points.foreach_get(attr, values)
+        data[attr] = values.reshape(-1, 2)
+    for attr in KEY_FLOAT_ATTRS:
+        data[attr] = np.empty(count, dtype=np.float32)
+        points.foreach_get(attr, data[attr])
+    for attr in KEY_ENUM_ATTRS:
+        data[attr] = np.empty(count, dtype=np.int32)
+        points.foreach_get(attr, data[attr])
+    return data
+
+def write_keyframes(fcurve, data):
+    points = fcurve.keyframe_points
+    count = len(data["co"])
+    if len(points) < count:
+        points.add(count - len(points))
+    while len(points) > count:
+        points.remove(points[-1], fast=True)
+    for attr, values in data.items():
+        points.foreach_set(attr, values.ravel())
+    fcurve.update()
+
+def repeat_fcurve_keys(fcurve, repeat_start, repeat_end, repeat_count):
+    """Dokleja repeat_count kopii kluczy z zakresu [repeat_start, repeat_end] jednym zapisem tablic."""
+    data = read_keyframes(fcurve)
+    frames = data["co"][:, 0]
+    source = (frames >= repeat_start) & (frames <= repeat_end)
+    if repeat_count < 1 or not source.any():
+        return 0
+
+    offsets = np.repeat(np.arange(1, repeat_count + 1) * (repeat_end - repeat_start), source.sum())
+    merged = {}
+    for attr, values in data.items():
+        copies = np.tile(values[source], (repeat_count, 1) if values.ndim == 2 else repeat_count)
+        if attr in KEY_VECTOR_ATTRS:
+            copies[:, 0] += offsets
+        merged[attr] = np.concatenate([values, copies])
+
+    # Jak przy keyframe_points.insert: klucz na tej samej klatce zastępuje wcześniejszy
+    frame_ids = np.rint(merged["co"][:, 0] * 1000).astype(np.int64)
+    _, last = np.unique(frame_ids[::-1], return_index=True)
+    keep = len(frame_ids) - 1 - last
+
+    write_keyframes(fcurve, {attr: values[keep] for attr, values in merged.items()})
+    return len(offsets)
+
+REPEAT_TRACK_NAME = "GUI Repeat"
+
+def copy_fcurve(fcurve, action, frame_offset=0.0):
+    group = fcurve.group.name if fcurve.group else ""
+    target = action.fcurves.find(fcurve.data_path, index=fcurve.array_index)
+    if target is None:
+        target = action.fcurves.new(fcurve.data_path, index=fcurve.array_index, action_group=group)
+    data = read_keyframes(fcurve)
+    for attr in KEY_VECTOR_ATTRS:
+        data[attr][:, 0] += frame_offset
+    write_keyframes(target, data)
+    target.extrapolation = fcurve.extrapolation
+    return target
+
+# Krzywe, którym modyfikator Cycles dodał create_repeat_animation - bake rusza tylko je,
+# a nie modyfikatory ustawione ręcznie przez użytkownika
+REPEAT_CYCLES_PROP = "gui_repeat_cycles"
+
+def _fcurve_tag(fcurve):
+    return f"{fcurve.data_path}[{fcurve.array_index}]"
+
+def keys_within(fcurve, repeat_start, repeat_end):
+    frames = read_keyframes(fcurve)["co"][:, 0]
+    return len(frames) > 0 and frames.min() >= repeat_start - 1e-3 and frames.max() <= repeat_end + 1e-3
+
+def cycle_fcurve(fcurve, repeat_start, repeat_end, repeat_count):
+    """Zapętla krzywą modyfikatorem Cycles zamiast kopiować klucze.
+
+    False gdy klucze wychodzą poza zakres albo krzywa ma już własny modyfikator Cycles.
+    """
+    if any(m.type == 'CYCLES' for m in fcurve.modifiers) or not keys_within(fcurve, repeat_start, repeat_end):
+        return False
+    frames = read_keyframes(fcurve)["co"][:, 0]
+
+    # Okres cyklu to zakres kluczy - dokładamy klucze na granicach, jeśli ich brak
+    for frame in (repeat_start, repeat_end):
+        if not np.any(np.abs(frames - frame) < 1e-3):
+            fcurve.keyframe_points.insert(frame, fcurve.evaluate(frame), options={'FAST'})
+    fcurve.update()
+
+    modifier = fcurve.modifiers.new('CYCLES')
+    modifier.mode_before = 'NONE'
+    modifier.mode_after = 'REPEAT'
+    modifier.cycles_after = repeat_count
+
+    action = fcurve.id_data
+    tags = set(json.loads(action.get(REPEAT_CYCLES_PROP, "[]")))
+    tags.add(_fcurve_tag(fcurve))
+    action[REPEAT_CYCLES_PROP] = json.dumps(sorted(tags))
+    return True
+
+def push_fcurves_to_nla(id_datas, fcurves, repeat_start, repeat_end, repeat_count):
+    """Przenosi krzywe do osobnej akcji odtwarzanej w pętli przez pasek NLA (na każdym ID używającym akcji).
+
+    Pasek gra tylko zakres powtórzenia, więc krzywe z kluczami poza nim zostają w akcji
+    i dostają zwykłe kopie kluczy.
+    """
+    action = id_datas[0].animation_data.action
+    looped = []
+    for fcurve in fcurves:
+        if keys_within(fcurve, repeat_start, repeat_end):
+            looped.append(fcurve)
+        else:
+            repeat_fcurve_keys(fcurve, repeat_start, repeat_end, repeat_count)
+    if not looped:
+        return None
+
+    loop_action = bpy.data.actions.new(f"{action.name}_repeat")
+    for fcurve in looped:
+        copy_fcurve(fcurve, loop_action)
+        action.fcurves.remove(fcurve)
+
+    for id_data in id_datas:
+        track = id_data.animation_data.nla_tracks.new()
+        track.name = REPEAT_TRACK_NAME
+        strip = track.strips.new(loop_action.name, int(repeat_start), loop_action)
+        if hasattr(strip, "action_slot") and getattr(loop_action, "slots", None):
+            strip.action_slot = loop_action.slots[0]
+        strip.action_frame_start = repeat_start
+        strip.action_frame_end = repeat_end
+        strip.repeat = repeat_count + 1
+    return loop_action
+
+def bake_repeats(id_data):
+    """Zamienia pętle (paski NLA z REPEAT_TRACK_NAME, modyfikatory Cycles) na zwykłe klucze."""
+    anim = id_data.animation_data
+    if anim is None:
+        return 0
+    baked = 0
+
+    for track in [t for t in anim.nla_tracks if t.name.startswith(REPEAT_TRACK_NAME)]:
+        if anim.action is None:
+            anim.action = bpy.data.actions.new(f"{id_data.name}Action")
+        for strip in track.strips:
+            length = strip.action_frame_end - strip.action_frame_start
+            offset = strip.frame_start - strip.action_frame_start
+            for fcurve in strip.action.fcurves:
+                target = copy_fcurve(fcurve, anim.action, offset)
+                repeat_fcurve_keys(target, strip.frame_start, strip.frame_start + length, strip.repeat - 1)
+                baked += 1
+        loop_actions = [strip.action for strip in track.strips]
+        anim.nla_tracks.remove(track)
+        for loop_action in loop_actions:
+            if loop_action and loop_action.users == 0:
+                bpy.data.actions.remove(loop_action)
+
+    if anim.action and REPEAT_CYCLES_PROP in anim.action:
+        tags = set(json.loads(anim.action[REPEAT_CYCLES_PROP]))
+        del anim.action[REPEAT_CYCLES_PROP]
+        for fcurve in anim.action.fcurves:
+            if _fcurve_tag(fcurve) not in tags:
+                continue
+            modifier = next((m for m in fcurve.modifiers if m.type == 'CYCLES' and m.mode_before == 'NONE'), None)
+            if modifier is None or modifier.mode_after != 'REPEAT' or modifier.cycles_after < 1:
+                continue
+            frames = read_keyframes(fcurve)["co"][:, 0]
+            count = modifier.cycles_after
+            fcurve.modifiers.remove(modifier)
+            repeat_fcurve_keys(fcurve, frames.min(), frames.max(), count)
+            baked += 1
+    return baked
+
+def animated_ids(context):
+    """ID z animacją dla zaznaczonych obiektów: obiekt, jego dane i shape keye."""
+    objects = list(getattr(context, "selected_objects", None) or [])
+    obj = getattr(context, "object", None)
+    if obj and obj not in objects:
+        objects.append(obj)
+
+    ids = []
+    for obj in objects:
+        data = obj.data
+        for id_data in (obj, data, getattr(data, "shape_keys", None)):
+            anim = getattr(id_data, "animation_data", None)
+            if anim is not None and id_data not in ids:
+                ids.append(id_data)
+    return ids
+
+def shape_list_fcurves(context):
+    obj_t = getattr(context, "object", None)
+    key = getattr(getattr(obj_t, "data", None), "shape_keys", None)
+    anim = getattr(key, "animation_data", None)
+    if anim is None or anim.action is None:
+        return {}
+
+    fcurves = []
+    for fcurve in anim.action.fcurves:
+        data_path = fcurve.data_path
+
+        if data_path.startswith('key_blocks'):
+            shape_key_name = data_path.split('"')[1]
+            if shape_key_name in shapes:
+                fcurves.append(fcurve)
+    return {anim.action.as_pointer(): ([key], fcurves)} if fcurves else {}
+
+def selected_channel_fcurves(context):
+    # Akcja współdzielona przez tłum obiektów jest przetwarzana tylko raz
+    groups = {}
+    for id_data in animated_ids(context):
+        action = id_data.animation_data.action
+        if action is None:
+            continue
+        entry = groups.get(action.as_pointer())
+        if entry is None:
+            fcurves = [fcurve for fcurve in action.fcurves if fcurve.select]
+            if not fcurves:
+                continue
+            entry = groups[action.as_pointer()] = ([], fcurves)
+        entry[0].append(id_data)
+    return groups
+
+def collect_repeat_fcurves(context, source):
+    """Słownik akcja -> (ID używające akcji, krzywe do zapętlenia) dla źródła SHAPES lub CHANNELS."""
+    if source == 'CHANNELS':
+        return selected_channel_fcurves(context)
+    return shape_list_fcurves(context)
+
+def create_repeat_animation(context, source='SHAPES'):
     scene = context.scene
     repeat_count = scene.repeat_count
     repeat_start = scene.repeat_start
     repeat_end = scene.repeat_end
-    shape_keys = shapes[:]  
 
-    obj_t = getattr(context, "object", None)
-    if obj_t:
-        action = obj_t.data.shape_keys.animation_data.action
-        for fcurve in action.fcurves:
-            data_path = fcurve.data_path
-
-            if data_path.startswith('key_blocks'):
-                shape_key_name = data_path.split('"')[1]
-                if shape_key_name in shape_keys: 
-                    keyframe_points = [keyframe for keyframe in fcurve.keyframe_points 
-                                       if repeat_start <= keyframe.co.x <= repeat_end]
-
-                    frame_range = repeat_end - repeat_start
-                    for count in range(1, repeat_count + 1):
-                        offset = count * frame_range
-                        for keyframe in keyframe_points:
-                            new_frame = keyframe.co.x + offset
-                            fcurve.keyframe_points.insert(new_frame, keyframe.co.y)
+    processed = 0
+    for id_datas, fcurves in collect_repeat_fcurves(context, source).values():
+        if scene.repeat_mode == 'NLA':
+            push_fcurves_to_nla(id_datas, fcurves, repeat_start, repeat_end, repeat_count)
+        else:
+            for fcurve in fcurves:
+                if scene.repeat_mode == 'CYCLES' and cycle_fcurve(fcurve, repeat_start, repeat_end, repeat_count):
+                    continue
+                repeat_fcurve_keys(fcurve, repeat_start, repeat_end, repeat_count)
+        processed += len(fcurves)
 
     for area in context.screen.areas:
-        if area.type == 'DOPESHEET_EDITOR':  
+        if area.type in {'DOPESHEET_EDITOR', 'GRAPH_EDITOR', 'NLA_EDITOR'}:
             area.tag_redraw()
+    return processed
+
+class OBJECT_OT_bake_repeat_animation(bpy.types.Operator):
+    bl_idname = "object.bake_repeat_animation"
+    bl_label = "Bake Repeats to Keys"
+    bl_description = "Replace repeat NLA strips and Cycles modifiers with real keyframes (e.g. for export)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        baked = sum(bake_repeats(id_data) for id_data in animated_ids(context))
+        if not baked:
+            self.report({'WARNING'}, "No repeats found on selected objects")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Baked {baked} curves")
+        return {'FINISHED'}
+
+def draw_repeat_menu(self, context):
+    layout = self.layout
+    layout.separator()
+    layout.operator("object.create_repeat_animation", text="Repeat Selected Channels").use_selected_channels = True
+    layout.operator("object.bake_repeat_animation")
+
+# Cache rzadkich delt: (wskaźnik Key, nazwa klucza) -> (stempel, indeksy, offsety float32).
+# Dane kluczy zmieniają się w edit/sculpt/weight paint - wtedy cały Key trafia do _dirty_keys;
+# undo/redo i wczytanie pliku czyszczą cały cache (wskaźniki mogą zostać, dane już nie)
+_delta_cache = {}
+_dirty_keys = set()
+_mix_stats = {"time": None, "keys": 0}
+DELTA_DIRTY_MODES = {'EDIT_MESH', 'SCULPT', 'PAINT_WEIGHT'}
+
+def read_key_coords(block):
+    co = np.empty(len(block.data) * 3, dtype=np.float32)
+    block.data.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+def invalidate_key_deltas(key, names=None):
+    pointer = key.as_pointer()
+    for cache_key in [k for k in _delta_cache if k[0] == pointer and (names is None or k[1] in names)]:
+        del _delta_cache[cache_key]
+
+def _consume_dirty(key):
+    if key.as_pointer() in _dirty_keys:
+        _dirty_keys.discard(key.as_pointer())
+        invalidate_key_deltas(key)
+
+@bpy.app.handlers.persistent
+def clear_delta_cache(*args):
+    _delta_cache.clear()
+    _dirty_keys.clear()
+
+def _cached(key, name, stamp, build):
+    cache_key = (key.as_pointer(), name)
+    entry = _delta_cache.get(cache_key)
+    if entry is None or entry[0] != stamp:
+        entry = _delta_cache[cache_key] = (stamp,) + build()
+    return entry[1:]
+
+def key_deltas(key):
+    """Rzadkie delty każdego klucza względem jego relative_key; przeliczane tylko dla zmienionych kluczy."""
+    _consume_dirty(key)
+
+    coords = {}
+    def coords_of(block):
+        if block.name not in coords:
+            coords[block.name] = read_key_coords(block)
+        return coords[block.name]
+
+    def build(block):
+        delta = coords_of(block) - coords_of(block.relative_key)
+        indices = np.flatnonzero(np.any(delta != 0.0, axis=1))
+        return indices, delta[indices]
+
+    deltas = {}
+    for block in key.key_blocks:
+        if block == key.reference_key or block.relative_key == block:
+            continue
+        stamp = (block.relative_key.name, len(block.data))
+        deltas[block.name] = _cached(key, block.name, stamp, lambda block=block: build(block))
+    return deltas
+
+def reference_coords(key):
+    block = key.reference_key
+    return _cached(key, None, (block.name, len(block.data)), lambda: (read_key_coords(block),))[0]
+
+def vertex_group_weights(obj, key, name):
+    group = obj.vertex_groups.get(name)
+    mesh = obj.data
+    # Wagi edytowane w weight paint/edit mode oznaczają Key jako brudny tak samo jak delty
+    _consume_dirty(key)
+
+    def build():
+        # Wagi grup nie mają zbiorczego foreach_get - zbieramy płaskie pary (wierzchołek, waga)
+        # jednym wyrażeniem i wpisujemy je do tablicy naraz zamiast element po elemencie
+        weights = np.zeros(len(mesh.vertices), dtype=np.float32)
+        if group is not None:
+            index = group.index
+            pairs = [(vertex.index, element.weight)
+                     for vertex in mesh.vertices for element in vertex.groups if element.group == index]
+            if pairs:
+                pairs = np.array(pairs, dtype=np.float64)
+                weights[pairs[:, 0].astype(np.int64)] = pairs[:, 1]
+        return (weights,)
+
+    stamp = (obj.as_pointer(), group.index if group is not None else -1, len(mesh.vertices))
+    return _cached(key, ("vertex_group", name), stamp, build)[0]
+
+def mix_shape_keys(obj, weights=None):
+    """basis + Σ wᵢ·Δᵢ z cache delt; domyślnie bieżące wartości suwaków (wyciszone klucze pomijane)."""
+    key = obj.data.shape_keys
+    deltas = key_deltas(key)
+    result = reference_coords(key).copy()
+    used = 0
+    for block in key.key_blocks:
+        weight = block.value if weights is None else weights.get(block.name, 0.0)
+        if block.mute or weight == 0.0 or block.name not in deltas:
+            continue
+        indices, offsets = deltas[block.name]
+        if block.vertex_group:
+            factor = weight * vertex_group_weights(obj, key, block.vertex_group)[indices, None]
+            result[indices] += factor * offsets
+        else:
+            result[indices] += weight * offsets
+        used += 1
+    return result, used
+
+def write_shape_key_mix(obj, coords, target=None, name="Mix"):
+    """Zapisuje wynik do nowego klucza albo nadpisuje istniejący (target)."""
+    key = obj.data.shape_keys
+    block = key.key_blocks.get(target) if target else None
+    if block is None:
+        block = obj.shape_key_add(name=name, from_mix=False)
+    block.data.foreach_set("co", coords.ravel())
+    # Zmieniony klucz i klucze liczone względem niego trzeba przeczytać ponownie
+    invalidate_key_deltas(key, {block.name, None} | {b.name for b in key.key_blocks if b.relative_key == block})
+    obj.data.update()
+    return block
+
+def invalidate_deltas_on_edit(scene, depsgraph=None):
+    if depsgraph is None or bpy.context.mode not in DELTA_DIRTY_MODES:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Mesh) and update.id.shape_keys:
+            _dirty_keys.add(update.id.shape_keys.as_pointer())
+        elif isinstance(update.id, bpy.types.Key):
+            _dirty_keys.add(update.id.as_pointer())
+
+class OBJECT_OT_bake_shape_key_mix(bpy.types.Operator):
+    bl_idname = "object.bake_shape_key_mix"
+    bl_label = "Bake Shape Key Mix"
+    bl_description = "Save the current combination of shape key values as a key"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    overwrite: bpy.props.BoolProperty(
+        name="Overwrite",
+        description="Overwrite the target key instead of adding a new one",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys and context.mode == 'OBJECT'
+
+    def execute(self, context):
+        scene = context.scene
+        obj_t = context.object
+        if self.overwrite and scene.shape_key_mix_target not in obj_t.data.shape_keys.key_blocks:
+            self.report({'ERROR'}, "Choose a key to overwrite")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        coords, used = mix_shape_keys(obj_t)
+        _mix_stats.update(time=time.perf_counter() - start, keys=used)
+
+        block = write_shape_key_mix(
+            obj_t, coords,
+            target=scene.shape_key_mix_target if self.overwrite else None,
+            name=scene.shape_key_mix_name or "Mix"
+        )
+        if scene.shape_key_mix_reset:
+            for other in obj_t.data.shape_keys.key_blocks:
+                other.value = 0.0
+            if not self.overwrite:
+                block.value = 1.0
+        self.report({'INFO'}, f"Mixed {used} keys into '{block.name}' in {_mix_stats['time'] * 1000:.1f} ms")
+        return {'FINISHED'}
+
+class OBJECT_OT_refresh_shape_key_deltas(bpy.types.Operator):
+    bl_idname = "object.refresh_shape_key_deltas"
+    bl_label = "Refresh Shape Key Cache"
+    bl_description = "Re-read shape key data (after edits made by other scripts)"
+
+    def execute(self, context):
+        obj_t = getattr(context, "object", None)
+        if obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys:
+            invalidate_key_deltas(obj_t.data.shape_keys)
+        return {'FINISHED'}
+
+class PT_MIXER_PT_PANEL(bpy.types.Panel):
+    bl_label = "Mixer"
+    bl_idname = 'PT_MIXER_PT_PANEL'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'GUI PatryCCio'
+    bl_parent_id = 'PT_ShapeKeyPanel'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys and obj_t.select_get()
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        key = context.object.data.shape_keys
+
+        active = sum(1 for block in key.key_blocks[1:] if block.value != 0.0 and not block.mute)
+        layout.label(text=f"Active keys: {active}")
+        if _mix_stats["time"] is not None:
+            layout.label(text=f"Last mix: {_mix_stats['keys']} keys, {_mix_stats['time'] * 1000:.1f} ms")
+
+        layout.prop(scene, 'shape_key_mix_reset')
+        row = layout.row(align=True)
+        row.prop(scene, 'shape_key_mix_name', text="")
+        row.operator("object.bake_shape_key_mix", text="New Key", icon="ADD").overwrite = False
+        row = layout.row(align=True)
+        row.prop_search(scene, 'shape_key_mix_target', key, "key_blocks", text="")
+        row.operator("object.bake_shape_key_mix", text="Overwrite", icon="FILE_REFRESH").overwrite = True
+        layout.operator("object.refresh_shape_key_deltas", icon="FILE_REFRESH")
+
+SHAPE_KEY_FILE_VERSION = 1
+
+def export_shape_keys(obj, filepath, threshold=0.0):
+    """Zapisuje klucze jako rzadkie delty (indeksy + offsety float32) w nieskompresowanym .npz."""
+    key = obj.data.shape_keys
+    deltas = key_deltas(key)
+    meta, counts, indices, offsets = [], [], [], []
+    for block in key.key_blocks:
+        if block.name not in deltas:
+            continue
+        block_indices, block_offsets = deltas[block.name]
+        if threshold > 0.0:
+            keep = np.abs(block_offsets).max(axis=1) > threshold
+            block_indices, block_offsets = block_indices[keep], block_offsets[keep]
+        meta.append({
+            "name": block.name,
+            "relative": block.relative_key.name,
+            "value": block.value,
+            "slider_min": block.slider_min,
+            "slider_max": block.slider_max,
+            "mute": block.mute,
+            "vertex_group": block.vertex_group,
+        })
+        counts.append(len(block_indices))
+        indices.append(block_indices)
+        offsets.append(block_offsets)
+
+    with open(filepath, 'wb') as f:
+        np.savez(
+            f,
+            version=np.array(SHAPE_KEY_FILE_VERSION),
+            vertex_count=np.array(len(obj.data.vertices)),
+            meta=np.array(json.dumps(meta)),
+            counts=np.array(counts, dtype=np.int64),
+            indices=np.concatenate(indices).astype(np.uint32) if indices else np.zeros(0, np.uint32),
+            offsets=np.concatenate(offsets) if offsets else np.zeros((0, 3), np.float32),
+        )
+    return len(meta), sum(counts)
+
+def load_npz_mmap(filepath):
+    """Mapuje tablice nieskompresowanego .npz prosto z pliku (np.load nie robi mmap dla archiwów)."""
+    arrays = {}
+    with zipfile.ZipFile(filepath) as archive, open(filepath, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+
+            # Nagłówek lokalny ZIP: 30 bajtów + nazwa + pole extra (może się różnić od katalogu centralnego)
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"Unsupported object array '{name}'")
 
-def update_panels_on_object_change(scene):
+            if not shape or 0 in shape:
+                # Skalary i puste tablice - memmap ich nie obsługuje, a są małe
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+                continue
+            arrays[name] = np.memmap(
+                filepath, dtype=dtype, mode='r', offset=f.tell(), shape=shape, order='F' if fortran_order else 'C'
+            )
+    return arrays
+
+def import_shape_keys(obj, filepath, overwrite=True):
+    """Odtwarza klucze z pliku: współrzędne klucza względnego + delty, zapis jednym foreach_set na klucz."""
+    arrays = load_npz_mmap(filepath)
+    if int(arrays["version"]) > SHAPE_KEY_FILE_VERSION:
+        raise ValueError("File was written by a newer version")
+    vertex_count = len(obj.data.vertices)
+    if int(arrays["vertex_count"]) != vertex_count:
+        raise ValueError(f"Vertex count mismatch: file {int(arrays['vertex_count'])}, mesh {vertex_count}")
+
+    if not obj.data.shape_keys:
+        obj.shape_key_add(name="Basis", from_mix=False)
+    key = obj.data.shape_keys
+    blocks = key.key_blocks
+
+    meta = json.loads(str(arrays["meta"]))
+    ends = np.cumsum(arrays["counts"])
+    starts = ends - arrays["counts"]
+    indices, offsets = arrays["indices"], arrays["offsets"]
+    # Najpierw tworzymy wszystkie klucze, żeby relative_key wskazywał właściwy blok także wtedy,
+    # gdy klucz względny występuje w pliku później
+    pending = {}
+    for entry, start, end in zip(meta, starts, ends):
+        block = blocks.get(entry["name"])
+        if block is not None and (not overwrite or block == key.reference_key):
+            continue
+        if block is None:
+            block = obj.shape_key_add(name=entry["name"], from_mix=False)
+        pending[entry["name"]] = (entry, start, end, block)
+
+    # Klucz względny zapisujemy przed kluczami, które od niego zależą (pętle relative - w kolejności pliku)
+    order = []
+    state = {}
+    for name in pending:
+        stack = [name]
+        while stack:
+            current = stack[-1]
+            if state.get(current) is None:
+                state[current] = 'OPEN'
+                relative = pending[current][0]["relative"]
+                if relative in pending and state.get(relative) is None:
+                    stack.append(relative)
+                    continue
+            stack.pop()
+            if state[current] != 'DONE':
+                state[current] = 'DONE'
+                order.append(current)
+
+    coords = {}
+    for name in order:
+        entry, start, end, block = pending[name]
+        relative = blocks.get(entry["relative"]) or key.reference_key
+        if relative.name not in coords:
+            coords[relative.name] = read_key_coords(relative)
+        co = coords[relative.name].copy()
+        co[indices[start:end]] += offsets[start:end]
+        block.data.foreach_set("co", co.ravel())
+        coords[block.name] = co
+
+        block.relative_key = relative
+        block.slider_min = entry["slider_min"]
+        block.slider_max = entry["slider_max"]
+        block.value = entry["value"]
+        block.mute = entry["mute"]
+        block.vertex_group = entry["vertex_group"]
+    imported = len(order)
+
+    del arrays, indices, offsets
+    invalidate_key_deltas(key)
+    obj.data.update()
+    return imported
+
+class OBJECT_OT_export_shape_keys(bpy.types.Operator, ExportHelper):
+    bl_idname = "object.export_shape_keys"
+    bl_label = "Export Shape Keys"
+    bl_description = "Save all shape keys of the active mesh as sparse deltas"
+
+    filename_ext = ".npz"
+    filter_glob: bpy.props.StringProperty(default="*.npz", options={'HIDDEN'})
+    threshold: bpy.props.FloatProperty(
+        name="Threshold",
+        description="Skip vertex offsets smaller than this (0 keeps every moved vertex)",
+        default=0.0,
+        min=0.0,
+        precision=5
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys and context.mode == 'OBJECT'
+
+    def execute(self, context):
+        start = time.perf_counter()
+        keys, stored = export_shape_keys(context.object, self.filepath, self.threshold)
+        self.report({'INFO'}, f"Exported {keys} keys ({stored} offsets) in {time.perf_counter() - start:.2f} s")
+        return {'FINISHED'}
+
+class OBJECT_OT_import_shape_keys(bpy.types.Operator, ImportHelper):
+    bl_idname = "object.import_shape_keys"
+    bl_label = "Import Shape Keys"
+    bl_description = "Load shape keys exported with Export Shape Keys (mesh must have the same vertex order)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = ".npz"
+    filter_glob: bpy.props.StringProperty(default="*.npz", options={'HIDDEN'})
+    overwrite: bpy.props.BoolProperty(
+        name="Overwrite Existing",
+        description="Replace keys with the same name",
+        default=True
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and context.mode == 'OBJECT'
+
+    def execute(self, context):
+        start = time.perf_counter()
+        try:
+            imported = import_shape_keys(context.object, self.filepath, self.overwrite)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as error:
+            self.report({'ERROR'}, f"Import failed: {error}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Imported {imported} keys in {time.perf_counter() - start:.2f} s")
+        return {'FINISHED'}
+
+# Wyniki ostatniej analizy kluczy aktywnego obiektu
+_analysis = {"pointer": None, "empty": [], "duplicates": [], "untouched": 0, "vertices": 0}
+SIGNATURE_SIZE = 16
+CLEANUP_ROWS = 20
+
+def delta_signatures(deltas, names, vertex_count, seed=0):
+    """Losowe rzutowanie delt (Johnson-Lindenstrauss): bliskie delty dają bliskie sygnatury."""
+    projection = np.random.default_rng(seed).standard_normal((vertex_count, 3, SIGNATURE_SIZE)).astype(np.float32)
+    projection /= np.sqrt(SIGNATURE_SIZE)
+    signatures = np.zeros((len(names), SIGNATURE_SIZE), dtype=np.float64)
+    for row, name in enumerate(names):
+        indices, offsets = deltas[name]
+        if len(indices):
+            signatures[row] = np.einsum('ij,ijp->p', offsets, projection[indices])
+    return signatures
+
+def delta_distance(first, second, vertex_count):
+    dense = np.zeros((vertex_count, 3), dtype=np.float32)
+    dense[first[0]] = first[1]
+    dense[second[0]] -= second[1]
+    return float(np.sqrt((dense.astype(np.float64) ** 2).sum()))
+
+def find_duplicate_keys(deltas, names, norms, vertex_count, tolerance, chunk=512):
+    """Pary kluczy o prawie identycznych deltach: kandydaci z sygnatur, potem dokładne sprawdzenie."""
+    signatures = delta_signatures(deltas, names, vertex_count)
+    square = (signatures ** 2).sum(axis=1)
+    pairs = []
+    for start in range(0, len(names), chunk):
+        rows = slice(start, start + chunk)
+        distance = square[rows, None] + square[None, :] - 2.0 * signatures[rows] @ signatures.T
+        scale = np.maximum(norms[rows, None], norms[None, :])
+        # Zapas 2x na błąd rzutowania - fałszywe trafienia odrzuca dokładny test
+        candidates = np.argwhere(np.sqrt(np.maximum(distance, 0.0)) <= 2.0 * tolerance * scale)
+        for i, j in candidates:
+            i += start
+            if i >= j or norms[i] == 0.0 or norms[j] == 0.0:
+                continue
+            exact = delta_distance(deltas[names[i]], deltas[names[j]], vertex_count)
+            if exact <= tolerance * max(norms[i], norms[j]):
+                pairs.append((names[i], names[j], exact / float(max(norms[i], norms[j]))))
+    return pairs
+
+def analyze_shape_keys(obj, epsilon, tolerance):
+    key = obj.data.shape_keys
+    vertex_count = len(obj.data.vertices)
+    deltas = key_deltas(key)
+    names = [block.name for block in key.key_blocks if block.name in deltas]
+
+    max_displacement = np.zeros(len(names))
+    norms = np.zeros(len(names))
+    touched = np.zeros(vertex_count, dtype=bool)
+    for row, name in enumerate(names):
+        indices, offsets = deltas[name]
+        if len(indices):
+            lengths = np.sqrt((offsets.astype(np.float64) ** 2).sum(axis=1))
+            moved = lengths >= epsilon
+            max_displacement[row] = lengths.max()
+            norms[row] = np.sqrt((lengths ** 2).sum())
+            touched[indices[moved]] = True
+
+    empty = [name for name, displacement in zip(names, max_displacement) if displacement < epsilon]
+    live = [row for row, displacement in enumerate(max_displacement) if displacement >= epsilon]
+    duplicates = find_duplicate_keys(deltas, [names[row] for row in live], norms[live], vertex_count, tolerance)
+
+    _analysis.update(
+        pointer=key.as_pointer(),
+        empty=empty,
+        duplicates=duplicates,
+        untouched=int(vertex_count - touched.sum()),
+        vertices=vertex_count,
+    )
+    return _analysis
+
+def remove_shape_keys(obj, names):
+    key = obj.data.shape_keys
+    names = set(names) - {key.reference_key.name}
+    anim = key.animation_data
+    if anim and anim.action:
+        for fcurve in [fcurve for fcurve in anim.action.fcurves if fcurve.data_path.startswith('key_blocks')]:
+            if fcurve.data_path.split('"')[1] in names:
+                anim.action.fcurves.remove(fcurve)
+
+    # Klucze zależne od usuwanego przepinamy na jego najbliższego pozostającego przodka, odejmując
+    # deltę usuwanego - inaczej Blender przepina je na Basis i ich kształt zawiera cudzą deltę.
+    # To samo przesunięcie dostają ich potomkowie, żeby ich delty (klucz - klucz względny) się nie zmieniły
+    coords = {}
+    def coords_of(block):
+        if block.name not in coords:
+            coords[block.name] = read_key_coords(block)
+        return coords[block.name]
+
+    children = {}
+    shifts = {}
+    relinks = {}
+    for block in key.key_blocks:
+        relative = block.relative_key
+        if block.name in names or block == key.reference_key or relative == block:
+            continue
+        if relative.name not in names:
+            children.setdefault(relative.name, []).append(block.name)
+            continue
+        ancestor, seen = relative, set()
+        while ancestor.name in names and ancestor.name not in seen:
+            seen.add(ancestor.name)
+            ancestor = ancestor.relative_key
+        if ancestor.name in names:
+            ancestor = key.reference_key
+        shifts[block.name] = coords_of(ancestor) - coords_of(relative)
+        relinks[block.name] = ancestor.name
+
+    stack = list(shifts)
+    while stack:
+        parent = stack.pop()
+        for child in children.get(parent, ()):
+            if child not in shifts:
+                shifts[child] = shifts[parent]
+                stack.append(child)
+
+    for name, shift in shifts.items():
+        block = key.key_blocks[name]
+        block.data.foreach_set("co", (coords_of(block) + shift).ravel())
+        if name in relinks:
+            block.relative_key = key.key_blocks[relinks[name]]
+
+    for name in names:
+        block = key.key_blocks.get(name)
+        if block is not None:
+            obj.shape_key_remove(block)
+        remove_shape_key_from_selection(name)
+
+    if obj.data.shape_keys:
+        invalidate_key_deltas(obj.data.shape_keys, names | set(shifts))
+    _analysis["empty"] = [name for name in _analysis["empty"] if name not in names]
+    _analysis["duplicates"] = [pair for pair in _analysis["duplicates"] if pair[0] not in names and pair[1] not in names]
+    return len(names)
+
+class OBJECT_OT_analyze_shape_keys(bpy.types.Operator):
+    bl_idname = "object.analyze_shape_keys"
+    bl_label = "Analyze Shape Keys"
+    bl_description = "Find empty keys, near-duplicate keys and vertices not moved by any key"
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys and context.mode == 'OBJECT'
+
+    def execute(self, context):
+        scene = context.scene
+        start = time.perf_counter()
+        result = analyze_shape_keys(context.object, scene.shape_key_epsilon, scene.shape_key_duplicate_tolerance)
+        self.report({'INFO'}, (
+            f"{len(result['empty'])} empty, {len(result['duplicates'])} duplicate pairs, "
+            f"{result['untouched']} untouched vertices ({time.perf_counter() - start:.2f} s)"
+        ))
+        return {'FINISHED'}
+
+class OBJECT_OT_cleanup_shape_keys(bpy.types.Operator):
+    bl_idname = "object.cleanup_shape_keys"
+    bl_label = "Remove Shape Keys"
+    bl_description = "Remove keys found by the analysis"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: bpy.props.EnumProperty(
+        items=[
+            ('EMPTY', 'Empty', 'Remove keys below the displacement threshold'),
+            ('DUPLICATES', 'Duplicates', 'Remove the second key of every duplicate pair'),
+            ('SINGLE', 'Single', 'Remove one key')
+        ],
+        default='EMPTY'
+    )
+    shape_key_name: bpy.props.StringProperty()
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return (obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys
+                and _analysis["pointer"] == obj_t.data.shape_keys.as_pointer())
+
+    def execute(self, context):
+        if self.mode == 'EMPTY':
+            names = _analysis["empty"]
+        elif self.mode == 'DUPLICATES':
+            # Zachowujemy pierwszy klucz z każdej pary; para z już usuniętym kluczem nic nie usuwa
+            names = []
+            for first, second, _ in _analysis["duplicates"]:
+                if first not in names and second not in names:
+                    names.append(second)
+        else:
+            names = [self.shape_key_name]
+        removed = remove_shape_keys(context.object, names)
+        self.report({'INFO'}, f"Removed {removed} keys")
+        return {'FINISHED'}
+
+class OBJECT_OT_select_untouched_vertices(bpy.types.Operator):
+    bl_idname = "object.select_untouched_vertices"
+    bl_label = "Select Untouched Vertices"
+    bl_description = "Select vertices that no shape key moves"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys and context.mode == 'OBJECT'
+
+    def execute(self, context):
+        mesh = context.object.data
+        epsilon = context.scene.shape_key_epsilon
+        touched = np.zeros(len(mesh.vertices), dtype=bool)
+        for indices, offsets in key_deltas(mesh.shape_keys).values():
+            touched[indices[np.sqrt((offsets.astype(np.float64) ** 2).sum(axis=1)) >= epsilon]] = True
+        mesh.vertices.foreach_set("select", ~touched)
+        mesh.update()
+        return {'FINISHED'}
+
+class PT_CLEANUP_PT_PANEL(bpy.types.Panel):
+    bl_label = "Cleanup"
+    bl_idname = 'PT_CLEANUP_PT_PANEL'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'GUI PatryCCio'
+    bl_parent_id = 'PT_ShapeKeyPanel'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys and obj_t.select_get()
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        row = layout.row(align=True)
+        row.prop(scene, 'shape_key_epsilon')
+        row.prop(scene, 'shape_key_duplicate_tolerance')
+        layout.operator("object.analyze_shape_keys", icon="VIEWZOOM")
+
+        if _analysis["pointer"] != context.object.data.shape_keys.as_pointer():
+            return
+
+        box = layout.box()
+        row = box.row()
+        row.label(text=f"Untouched vertices: {_analysis['untouched']} / {_analysis['vertices']}")
+        row.operator("object.select_untouched_vertices", text="", icon="RESTRICT_SELECT_OFF")
+
+        box = layout.box()
+        row = box.row()
+        row.label(text=f"Empty keys: {len(_analysis['empty'])}")
+        row.operator("object.cleanup_shape_keys", text="Remove All", icon="TRASH").mode = 'EMPTY'
+        for name in _analysis["empty"][:CLEANUP_ROWS]:
+            row = box.row()
+            row.label(text=name)
+            remove = row.operator("object.cleanup_shape_keys", text="", icon="X")
+            remove.mode = 'SINGLE'
+            remove.shape_key_name = name
+
+        box = layout.box()
+        row = box.row()
+        row.label(text=f"Duplicate pairs: {len(_analysis['duplicates'])}")
+        row.operator("object.cleanup_shape_keys", text="Remove All", icon="TRASH").mode = 'DUPLICATES'
+        for first, second, difference in _analysis["duplicates"][:CLEANUP_ROWS]:
+            row = box.row()
+            row.label(text=f"{first} = {second} ({difference * 100:.2f}%)")
+            remove = row.operator("object.cleanup_shape_keys", text="", icon="X")
+            remove.mode = 'SINGLE'
+            remove.shape_key_name = second
+
+# Pary stron rozpoznawane w nazwach kluczy (sufiks/prefiks), np. Smile.L, Smile_R, BrowLeft
+MIRROR_SIDE_PATTERNS = [
+    (re.compile(r'([._\- ])([LlRr])$'), {'L': 'R', 'R': 'L', 'l': 'r', 'r': 'l'}),
+    (re.compile(r'^([LlRr])([._\- ])'), {'L': 'R', 'R': 'L', 'l': 'r', 'r': 'l'}),
+    # Left/Right tylko jako osobny człon: po separatorze/początku albo na granicy camelCase
+    # ("browLeft"), i bez dalszych małych liter - "Cleft", "Bright", "Lefty" zostają bez zmian
+    (re.compile(r'(?:(?<![^._\- \d])|(?<=[a-z])(?=[A-Z]))(Left|Right|left|right|LEFT|RIGHT)(?![a-z])'), {
+        'Left': 'Right', 'Right': 'Left', 'left': 'right', 'right': 'left', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'
+    }),
+]
+
+def mirror_name(name):
+    for pattern, swap in MIRROR_SIDE_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            group = 2 if pattern.groups == 2 and match.group(2) in swap else 1
+            start, end = match.span(group)
+            return name[:start] + swap[match.group(group)] + name[end:]
+    return None
+
+def symmetry_map(obj, tolerance):
+    """Indeks wierzchołka lustrzanego (po osi X) dla każdego wierzchołka, -1 gdy brak; liczony raz na mesh."""
+    key = obj.data.shape_keys
+
+    def build():
+        coords = reference_coords(key)
+        tree = mathutils.kdtree.KDTree(len(coords))
+        for index, co in enumerate(coords):
+            tree.insert(co, index)
+        tree.balance()
+
+        mapping = np.full(len(coords), -1, dtype=np.int64)
+        for index, (x, y, z) in enumerate(coords.tolist()):
+            found = tree.find((-x, y, z))
+            if found[1] is not None and found[2] <= tolerance:
+                mapping[index] = found[1]
+        return (mapping,)
+
+    return _cached(key, ("symmetry", tolerance), (key.reference_key.name, len(obj.data.vertices)), build)[0]
+
+def mirror_shape_keys(obj, names, tolerance):
+    """Tworzy/nadpisuje klucze przeciwnej strony: delty przeniesione mapą symetrii, z zanegowanym X."""
+    key = obj.data.shape_keys
+    blocks = key.key_blocks
+    mapping = symmetry_map(obj, tolerance)
+    deltas = key_deltas(key)
+    coords = {}
+    mirrored, skipped = [], []
+    written = set()
+
+    for name in names:
+        target_name = mirror_name(name)
+        # Drugi klucz pary (np. .R po .L) właśnie został nadpisany - jego delty w `deltas` są nieaktualne
+        if target_name is None or name not in deltas or target_name == name or name in written:
+            skipped.append(name)
+            continue
+        source = blocks[name]
+        indices, offsets = deltas[name]
+        targets = mapping[indices]
+        matched = targets >= 0
+
+        relative = blocks.get(mirror_name(source.relative_key.name) or "") or source.relative_key
+        if relative.name not in coords:
+            coords[relative.name] = read_key_coords(relative)
+        co = coords[relative.name].copy()
+        co[targets[matched]] += offsets[matched] * np.array((-1.0, 1.0, 1.0), dtype=np.float32)
+
+        target = blocks.get(target_name)
+        if target is None:
+            target = obj.shape_key_add(name=target_name, from_mix=False)
+        target.data.foreach_set("co", co.ravel())
+        coords.pop(target.name, None)
+
+        target.relative_key = relative
+        target.slider_min = source.slider_min
+        target.slider_max = source.slider_max
+        if source.vertex_group:
+            group_name = mirror_name(source.vertex_group) or source.vertex_group
+            target.vertex_group = group_name if group_name in obj.vertex_groups else source.vertex_group
+        invalidate_key_deltas(key, {target.name} | {b.name for b in blocks if b.relative_key == target})
+        mirrored.append(target_name)
+        written.add(target_name)
+
+    obj.data.update()
+    unmatched = int((mapping < 0).sum())
+    return mirrored, skipped, unmatched
+
+class OBJECT_OT_mirror_shape_keys(bpy.types.Operator):
+    bl_idname = "object.mirror_shape_keys"
+    bl_label = "Mirror Shape Keys"
+    bl_description = "Create the opposite-side (.L/.R, Left/Right) version of the selected keys (active key if none selected)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj_t = getattr(context, "object", None)
+        return obj_t and obj_t.type == 'MESH' and obj_t.data.shape_keys and context.mode == 'OBJECT'
+
+    def execute(self, context):
+        obj_t = context.object
+        names = shapes[:] or ([obj_t.active_shape_key.name] if obj_t.active_shape_key else [])
+        start = time.perf_counter()
+        mirrored, skipped, unmatched = mirror_shape_keys(obj_t, names, context.scene.shape_key_mirror_tolerance)
+        if not mirrored:
+            self.report({'WARNING'}, "No keys with a side in their name (.L/.R, Left/Right)")
+            return {'CANCELLED'}
+
+        message = f"Mirrored {len(mirrored)} keys in {time.perf_counter() - start:.2f} s"
+        if skipped:
+            message += f", skipped {len(skipped)}"
+        if unmatched:
+            message += f", {unmatched} vertices without mirror partner"
+        self.report({'WARNING'} if unmatched else {'INFO'}, message)
+        return {'FINISHED'}
+
+# Wartości animowanych kluczy dla każdej klatki zakresu sceny - liczone raz, kasowane po zmianie akcji
+_value_cache = {"stamp": None, "names": [], "rows": {}, "frames": None, "values": None}
+SPARKLINE_CHARS = "▁▂▃▄▅▆▇█"
+SPARKLINE_WIDTH = 24
+INSPECT_ROWS = 30
+
+def shape_key_value_cache(obj, scene):
+    key = obj.data.shape_keys
+    anim = key.animation_data
+    action = anim.action if anim else None
+    # Indeks kluczy jest przebudowywany tylko po zmianie nazw - jego numer generacji wystarcza jako stempel
+    stamp = (key.as_pointer(), action.as_pointer() if action else 0, scene.frame_start, scene.frame_end,
+             shape_key_index(key)["generation"])
+    if _value_cache["stamp"] == stamp:
+        return _value_cache
+
+    frames = np.arange(scene.frame_start, scene.frame_end + 1)
+    fcurves = {fcurve.data_path: fcurve for fcurve in action.fcurves if fcurve.array_index == 0} if action else {}
+    names, curves = [], []
+    for block in key.key_blocks[1:]:
+        fcurve = fcurves.get(f'key_blocks["{bpy.utils.escape_identifier(block.name)}"].value')
+        if fcurve is not None and not fcurve.mute:
+            names.append(block.name)
+            curves.append(fcurve)
+
+    values = np.empty((len(curves), len(frames)), dtype=np.float32)
+    for row, fcurve in enumerate(curves):
+        evaluate = fcurve.evaluate
+        values[row] = [evaluate(frame) for frame in frames.tolist()]
+
+    _value_cache.update(
+        stamp=stamp,
+        names=names,
+        rows={name: row for row, name in enumerate(names)},
+        frames=frames,
+        values=values,
+    )
+    return _value_cache
+
+def invalidate_value_cache():
+    _value_cache["stamp"] = None
+
+def shape_key_values_at(obj, scene, frame):
+    """Wartości kluczy w klatce bez przeliczania sceny; nieanimowane klucze - bieżąca wartość."""
+    cache = shape_key_value_cache(obj, scene)
+    column = int(frame) - scene.frame_start
+    inside = 0 <= column < len(cache["frames"])
+    result = {}
+    for block in obj.data.shape_keys.key_blocks[1:]:
+        row = cache["rows"].get(block.name)
+        if row is None:
+            result[block.name] = block.value
+        elif inside:
+            result[block.name] = float(cache["values"][row, column])
+        else:
+            result[block.name] = float(cache["values"][row, 0 if column < 0 else -1])
+    return result
+
+def sparkline(values, minimum, maximum):
+    if not len(values):
+        return ""
+    samples = values[np.linspace(0, len(values) - 1, min(SPARKLINE_WIDTH, len(values))).round().astype(int)]
+    span = maximum - minimum or 1.0
+    levels = np.clip((samples - minimum) / span * (len(SPARKLINE_CHARS) - 1), 0, len(SPARKLINE_CHARS) - 1)
+    return "".join(SPARKLINE_CHARS[int(round(level))] for level in levels)
+
+def invalidate_values_on_action_change(scene, depsgraph=None):
+    if depsgraph is None:
+        invalidate_value_cache()
+        return
+    if any(isinstance(update.id, bpy.types.Action) for update in depsgraph.updates):
+        invalidate_value_cache()
+
+def update_panels_on_object_change(scene, depsgraph=None):
+    # Panele zależą tylko od aktywnego obiektu i nazw jego shape keyów -
+    # aktualizacje transformacji, edycje siatki i zmiany klatki pomijamy bez przeglądania kluczy
+    obj = getattr(bpy.context, "object", None)
+    pointer = obj.as_pointer() if obj else 0
+    frame = scene.frame_current if scene else None
+    frame_changed = frame != update_panels_on_object_change.previous_frame
+    update_panels_on_object_change.previous_frame = frame
+    if pointer == reset_shape_key_panels.previous_object and depsgraph is not None:
+        screen = getattr(bpy.context, "screen", None)
+        if frame_changed or (screen and screen.is_animation_playing):
+            return
+        # Dodanie/usunięcie/zmiana nazwy klucza zawsze oznacza Key; same edycje geometrii Mesh - nie
+        if not any(isinstance(update.id, bpy.types.Key) for update in depsgraph.updates):
+            return
     reset_shape_key_panels(bpy.context)
 
 def register():
@@ -249,9 +1670,43 @@ def register():
     bpy.utils.register_class(OBJECT_OT_create_shape_key_panels)
     bpy.utils.register_class(OBJECT_OT_change_frame)
     bpy.utils.register_class(OBJECT_OT_create_repeat_animation)
+    bpy.utils.register_class(OBJECT_OT_bake_repeat_animation)
+    bpy.utils.register_class(OBJECT_OT_bake_shape_key_mix)
+    bpy.utils.register_class(OBJECT_OT_refresh_shape_key_deltas)
+    bpy.utils.register_class(PT_MIXER_PT_PANEL)
+    bpy.utils.register_class(OBJECT_OT_export_shape_keys)
+    bpy.utils.register_class(OBJECT_OT_import_shape_keys)
+    bpy.utils.register_class(OBJECT_OT_analyze_shape_keys)
+    bpy.utils.register_class(OBJECT_OT_cleanup_shape_keys)
+    bpy.utils.register_class(OBJECT_OT_select_untouched_vertices)
+    bpy.utils.register_class(PT_CLEANUP_PT_PANEL)
+    bpy.utils.register_class(OBJECT_OT_mirror_shape_keys)
     bpy.utils.register_class(OBJECT_OT_add_shape_key_to_selected)
     bpy.utils.register_class(OBJECT_OT_remove_shape_key_from_selected)
+    bpy.utils.register_class(OBJECT_OT_toggle_shape_key_group)
+    bpy.utils.register_class(MESH_UL_grouped_shape_keys)
 
+    bpy.types.Scene.shape_key_view = bpy.props.EnumProperty(
+        name="Shape Key View",
+        items=[
+            ('PANELS', "Group Panels", "One sub-panel per shape key group"),
+            ('LIST', "List", "Single scrolling list, for meshes with many shape keys"),
+        ],
+        default='PANELS',
+        update=update_shape_key_view
+    )
+    bpy.types.Scene.shape_key_group_filter = bpy.props.EnumProperty(
+        name="Group",
+        description="Show only shape keys of this group",
+        items=get_group_filter_items
+    )
+    bpy.types.Scene.shape_key_list_rows = bpy.props.IntProperty(
+        name="Rows",
+        description="Number of shape keys visible at once in the list",
+        default=20,
+        min=5,
+        max=200
+    )
     bpy.types.Scene.repeat_count = bpy.props.IntProperty(
         name="Repeat Count",
         description="Number of times to repeat the animation",
@@ -267,41 +1722,126 @@ def register():
         description="End frame of the repeat animation",
         default=10
     )
+    bpy.types.Scene.repeat_mode = bpy.props.EnumProperty(
+        name="Repeat Mode",
+        description="How the repeated range is stored",
+        items=[
+            ('KEYS', "Keys", "Copy keyframes (destructive)"),
+            ('CYCLES', "Cycles", "Loop the range with a Cycles modifier, keys stay editable"),
+            ('NLA', "NLA", "Move the curves to an action looped by an NLA strip"),
+        ],
+        default='KEYS'
+    )
+    bpy.types.Scene.repeat_source = bpy.props.EnumProperty(
+        name="Repeat Source",
+        description="Which fcurves are repeated",
+        items=[
+            ('SHAPES', "Shape List", "Shape keys added to the animator list"),
+            ('CHANNELS', "Selected Channels", "Channels selected in the dopesheet/graph editor on all selected objects"),
+        ],
+        default='SHAPES'
+    )
+    bpy.types.Scene.shape_key_mix_name = bpy.props.StringProperty(
+        name="Mix Name",
+        description="Name of the key created from the mix",
+        default="Mix"
+    )
+    bpy.types.Scene.shape_key_mix_target = bpy.props.StringProperty(
+        name="Mix Target",
+        description="Key overwritten with the mix"
+    )
+    bpy.types.Scene.shape_key_mix_reset = bpy.props.BoolProperty(
+        name="Reset Values",
+        description="Set all key values to zero after baking (the new key is set to 1)",
+        default=True
+    )
+    bpy.types.Scene.shape_key_epsilon = bpy.props.FloatProperty(
+        name="Epsilon",
+        description="Displacement below which a key or vertex counts as unchanged",
+        default=1e-4,
+        min=0.0,
+        precision=6
+    )
+    bpy.types.Scene.shape_key_duplicate_tolerance = bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Relative delta difference below which two keys count as duplicates",
+        default=0.01,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    bpy.types.Scene.shape_key_mirror_tolerance = bpy.props.FloatProperty(
+        name="Mirror Tolerance",
+        description="Maximum distance between a vertex and the mirror of its partner",
+        default=1e-3,
+        min=0.0,
+        precision=5
+    )
+    bpy.types.Scene.shape_key_inspect_frame = bpy.props.IntProperty(
+        name="Inspect Frame",
+        description="Frame whose shape key values are shown (read from the cache, the scene is not evaluated)",
+        default=1
+    )
+    bpy.types.Scene.shape_key_inspect_only = bpy.props.BoolProperty(
+        name="Inspect Only",
+        description="Frame buttons move the inspect frame instead of the scene frame",
+        default=False
+    )
+    bpy.types.Scene.shape_key_search = bpy.props.StringProperty(
+        name="Search",
+        description="Find shape keys by name words or prefixes (e.g. 'brow up', 'mouthSm')",
+        options={'TEXTEDIT_UPDATE'}
+    )
     bpy.types.Scene.frame_change_amount = bpy.props.IntProperty(
         name="Frame Change Amount",
         description="Amount to change the frame by",
         default=1
     )
 
+    bpy.types.DOPESHEET_MT_channel.append(draw_repeat_menu)
+    bpy.types.GRAPH_MT_channel.append(draw_repeat_menu)
     bpy.app.handlers.depsgraph_update_post.append(update_panels_on_object_change)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_deltas_on_edit)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+        handlers.append(clear_delta_cache)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_values_on_action_change)
 
     reset_shape_key_panels(bpy.context)
 
 def reset_shape_key_panels(context):
     global shapes
     obj = getattr(context, "object", None)
-    if obj != reset_shape_key_panels.previous_object:
+    pointer = obj.as_pointer() if obj else 0
+    if pointer != reset_shape_key_panels.previous_object:
         shapes = []
-        reset_shape_key_panels.previous_object = obj
+        reset_shape_key_panels.previous_object = pointer
 
-    if obj and obj.type == 'MESH':
-        mesh = obj.data
-        if mesh.shape_keys:
-            grouped_keys = group_shape_keys(mesh.shape_keys.key_blocks)
-            register_shape_key_panels(grouped_keys)
+    names = ()
+    if obj and obj.type == 'MESH' and obj.data.shape_keys:
+        names = tuple(key.name for key in obj.data.shape_keys.key_blocks)
+    if names == reset_shape_key_panels.previous_names:
+        return
+    reset_shape_key_panels.previous_names = names
+    invalidate_shape_key_index()
+
+    if getattr(context.scene, "shape_key_view", 'PANELS') == 'LIST':
+        sync_shape_key_panels(set())
+    else:
+        sync_shape_key_panels(set(parse_shape_key_name(name)[0] for name in names))
 
 def unregister_panels():
-    for panel in registered_panels:
+    for panel in registered_panels.values():
         bpy.utils.unregister_class(panel)
     registered_panels.clear()
+    reset_shape_key_panels.previous_names = None
 
 def group_shape_keys(shape_keys):
+    # Nazwy są już rozbite w indeksie kluczy - parsujemy tylko klucz bazowy (poza grupami indeksu)
+    index_data = shape_key_index(shape_keys.id_data)
     grouped_keys = {}
-    for key in shape_keys:
-        group, key_name = parse_shape_key_name(key.name)
-        if group not in grouped_keys:
-            grouped_keys[group] = []
-        grouped_keys[group].append(key_name)
+    for i, (group_id, key_name) in enumerate(zip(index_data["group_of"], index_data["labels"])):
+        group = index_data["groups"][group_id] if group_id >= 0 else parse_shape_key_name(index_data["names"][i])[0]
+        grouped_keys.setdefault(group, []).append(key_name)
     return grouped_keys
 
 def parse_shape_key_name(name):
@@ -309,11 +1849,14 @@ def parse_shape_key_name(name):
         return name.split("_", 1)
     return "Other", name
 
-def register_shape_key_panels(grouped_keys):
-    for group, keys in grouped_keys.items():
+def sync_shape_key_panels(groups):
+    # Rejestrujemy/wyrejestrowujemy tylko panele grup, które się pojawiły lub zniknęły
+    for group in set(registered_panels) - groups:
+        bpy.utils.unregister_class(registered_panels.pop(group))
+    for group in sorted(groups - set(registered_panels)):
         panel_class = create_shape_key_item_panel(group)
         bpy.utils.register_class(panel_class)
-        registered_panels.append(panel_class)
+        registered_panels[group] = panel_class
 
 def unregister():
     bpy.utils.unregister_class(PT_ShapeKeyPanel)
@@ -322,17 +1865,54 @@ def unregister():
     bpy.utils.unregister_class(OBJECT_OT_create_shape_key_panels)
     bpy.utils.unregister_class(OBJECT_OT_change_frame)
     bpy.utils.unregister_class(OBJECT_OT_create_repeat_animation)
+    bpy.utils.unregister_class(OBJECT_OT_bake_repeat_animation)
+    bpy.utils.unregister_class(OBJECT_OT_mirror_shape_keys)
+    bpy.utils.unregister_class(PT_CLEANUP_PT_PANEL)
+    bpy.utils.unregister_class(OBJECT_OT_select_untouched_vertices)
+    bpy.utils.unregister_class(OBJECT_OT_cleanup_shape_keys)
+    bpy.utils.unregister_class(OBJECT_OT_analyze_shape_keys)
+    bpy.utils.unregister_class(OBJECT_OT_import_shape_keys)
+    bpy.utils.unregister_class(OBJECT_OT_export_shape_keys)
+    bpy.utils.unregister_class(PT_MIXER_PT_PANEL)
+    bpy.utils.unregister_class(OBJECT_OT_refresh_shape_key_deltas)
+    bpy.utils.unregister_class(OBJECT_OT_bake_shape_key_mix)
     bpy.utils.unregister_class(OBJECT_OT_add_shape_key_to_selected)
     bpy.utils.unregister_class(OBJECT_OT_remove_shape_key_from_selected)
+    bpy.utils.unregister_class(OBJECT_OT_toggle_shape_key_group)
+    bpy.utils.unregister_class(MESH_UL_grouped_shape_keys)
 
     del bpy.types.Scene.repeat_count
     del bpy.types.Scene.repeat_start
     del bpy.types.Scene.repeat_end
+    del bpy.types.Scene.repeat_mode
+    del bpy.types.Scene.repeat_source
+    del bpy.types.Scene.shape_key_mix_name
+    del bpy.types.Scene.shape_key_mix_target
+    del bpy.types.Scene.shape_key_mix_reset
+    del bpy.types.Scene.shape_key_epsilon
+    del bpy.types.Scene.shape_key_duplicate_tolerance
+    del bpy.types.Scene.shape_key_mirror_tolerance
+    del bpy.types.Scene.shape_key_inspect_frame
+    del bpy.types.Scene.shape_key_inspect_only
+    del bpy.types.Scene.shape_key_search
     del bpy.types.Scene.frame_change_amount
+    del bpy.types.Scene.shape_key_view
+    del bpy.types.Scene.shape_key_group_filter
+    del bpy.types.Scene.shape_key_list_rows
 
+    bpy.types.DOPESHEET_MT_channel.remove(draw_repeat_menu)
+    bpy.types.GRAPH_MT_channel.remove(draw_repeat_menu)
     bpy.app.handlers.depsgraph_update_post.remove(update_panels_on_object_change)
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_deltas_on_edit)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+        if clear_delta_cache in handlers:
+            handlers.remove(clear_delta_cache)
+    bpy.app.handlers.depsgraph_update_post.remove(invalidate_values_on_action_change)
+    unregister_panels()
 
 reset_shape_key_panels.previous_object = None
+update_panels_on_object_change.previous_frame = None
+reset_shape_key_panels.previous_names = None
 
 if __name__ == "__main__":
     register()
@@ -1,5 +1,11 @@
 import bpy
 import random
+import os
+import json
+import time
+import subprocess
+import traceback
+import numpy as np
 
 class TextureBakerProps(bpy.types.PropertyGroup):
     bake_base_color: bpy.props.BoolProperty(name="Bake Base Color", default=True)
@@ -31,6 +37,39 @@ class TextureBakerProps(bpy.types.PropertyGroup):
         description="Select material from active object",
         items=lambda self, context: self.get_material_items(context)
     )
+    skip_constant_channels: bpy.props.BoolProperty(
+        name="Skip Bake for Constants",
+        description="Write unlinked BSDF values straight into the image instead of baking them",
+        default=True
+    )
+    constant_image_size: bpy.props.EnumProperty(
+        name="Constant Size",
+        description="Size of images written for constant channels",
+        items=[
+            ('FULL', "Texture Size", "Same size as baked textures"),
+            ('1', "1x1", ""),
+            ('8', "8x8", ""),
+            ('64', "64x64", "")
+        ],
+        default='FULL'
+    )
+    resume_bake: bpy.props.BoolProperty(
+        name="Resume Scene Bake",
+        description="Skip jobs listed in the output folder's bake manifest whose images exist",
+        default=True
+    )
+    parallel_bake: bpy.props.BoolProperty(
+        name="Parallel (Background Workers)",
+        description="Bake scene jobs in background Blender processes reading the saved .blend",
+        default=False
+    )
+    max_workers: bpy.props.IntProperty(
+        name="Max Workers",
+        description="Upper limit of background workers (0 = number of CPU cores); also limited by free memory",
+        default=0,
+        min=0,
+        max=256
+    )
     use_scene_cm: bpy.props.BoolProperty(
     name="Use Scene Color Management",
     description="Use current scene color management settings",
@@ -47,6 +86,276 @@ class TextureBakerProps(bpy.types.PropertyGroup):
         return items if items else [('NONE', "No Materials", "")]
 
 
+# (etykieta, właściwość w props, socket BSDF, sufiks pliku, typ bake)
+BAKE_CHANNELS = [
+    ("Base Color", "bake_base_color", "Base Color", 'base_color', 'EMIT'),
+    ("Roughness", "bake_roughness", "Roughness", 'roughness', 'EMIT'),
+    ("Metallic", "bake_metallic", "Metallic", 'metallic', 'EMIT'),
+    ("Alpha", "bake_alpha", "Alpha", 'alpha', 'EMIT'),
+    ("Normal", "bake_normal_map", "Normal", 'normal', 'NORMAL'),
+]
+
+def enabled_channels(props):
+    return [channel for channel in BAKE_CHANNELS if getattr(props, channel[1])]
+
+def find_bake_nodes(material):
+    """(BSDF, Output) materiału albo None, gdy materiału nie da się zbake'ować."""
+    if not material or not material.use_nodes:
+        return None
+    nodes = material.node_tree.nodes
+    bsdf_node = next((n for n in nodes if n.type == 'BSDF_PRINCIPLED'), None)
+    output_node = next((n for n in nodes if n.type == 'OUTPUT_MATERIAL'), None)
+    if not bsdf_node or not output_node:
+        return None
+    return bsdf_node, output_node
+
+def new_bake_image(material, suffix, size):
+    image_name = f"{material.name}_{suffix.upper()}"
+    image = bpy.data.images.new(name=image_name, width=size, height=size, alpha=True)
+    image.colorspace_settings.name = 'sRGB' if suffix == 'base_color' else 'Non-Color'
+    return image
+
+def setup_channel(material, channel, image):
+    """Dodaje aktywny node obrazu i (dla EMIT) emisję podpiętą pod Output; zwraca stan do sprzątnięcia."""
+    label, prop_name, socket_name, suffix, bake_type = channel
+    node_tree = material.node_tree
+    bsdf_node, output_node = find_bake_nodes(material)
+    # Zapamiętaj, co naprawdę zasila Output.Surface (także Mix/Add Shader), żeby to przywrócić po bake'u
+    surface = output_node.inputs["Surface"]
+    original_link = (surface.links[0].from_socket, surface) if surface.is_linked else None
+
+    tex_node = node_tree.nodes.new('ShaderNodeTexImage')
+    tex_node.image = image
+    tex_node.select = True
+    node_tree.nodes.active = tex_node
+
+    emission_node = None
+    if bake_type == 'EMIT':
+        emission_node = node_tree.nodes.new('ShaderNodeEmission')
+        if bsdf_node.inputs[socket_name].is_linked:
+            from_socket = bsdf_node.inputs[socket_name].links[0].from_socket
+            node_tree.links.new(emission_node.inputs["Color"], from_socket)
+        else:
+            val = bsdf_node.inputs[socket_name].default_value
+            if isinstance(val, float):
+                emission_node.inputs["Color"].default_value = (val, val, val, 1)
+            else:
+                emission_node.inputs["Color"].default_value = val
+        node_tree.links.new(output_node.inputs["Surface"], emission_node.outputs["Emission"])
+
+    return {
+        "material": material,
+        "channel": channel,
+        "image": image,
+        "tex_node": tex_node,
+        "emission_node": emission_node,
+        "original_link": original_link,
+    }
+
+def setup_scratch(material):
+    """Bake wielu slotów wymaga aktywnego obrazu w każdym materiale - materiały bez BSDF dostają obraz 1x1."""
+    image = bpy.data.images.new(name=f"{material.name}_SCRATCH", width=1, height=1)
+    tex_node = material.node_tree.nodes.new('ShaderNodeTexImage')
+    tex_node.image = image
+    material.node_tree.nodes.active = tex_node
+    return {"material": material, "image": image, "tex_node": tex_node, "scratch": True}
+
+def teardown_channel(state, assign):
+    """Usuwa emisję i przywraca oryginalne źródło Output.Surface; assign=True podpina zbake'owaną teksturę do BSDF."""
+    material = state["material"]
+    node_tree = material.node_tree
+    tex_node = state["tex_node"]
+
+    if state.get("scratch"):
+        node_tree.nodes.remove(tex_node)
+        bpy.data.images.remove(state["image"])
+        return
+
+    if state["emission_node"]:
+        node_tree.nodes.remove(state["emission_node"])
+    if state["original_link"]:
+        node_tree.links.new(state["original_link"][1], state["original_link"][0])
+
+    if not assign:
+        node_tree.nodes.remove(tex_node)
+        return
+
+    bsdf_node, _ = find_bake_nodes(material)
+    target_input = state["channel"][2]
+    # Podłącz baked teksturę do odpowiedniego inputu BSDF
+    if target_input in bsdf_node.inputs:
+        node_tree.links.new(bsdf_node.inputs[target_input], tex_node.outputs['Color'])
+
+    if state["channel"][4] == 'NORMAL':
+        normal_map = node_tree.nodes.new('ShaderNodeNormalMap')
+        normal_map.location = (tex_node.location.x + 200, tex_node.location.y)
+        node_tree.links.new(normal_map.inputs['Color'], tex_node.outputs['Color'])
+        node_tree.links.new(bsdf_node.inputs['Normal'], normal_map.outputs['Normal'])
+
+def prepare_bake(context, obj):
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    context.view_layer.objects.active = obj
+
+    bake = context.scene.render.bake
+    bake.use_selected_to_active = False
+    bake.use_clear = True
+    bake.margin = 2
+    bake.target = 'IMAGE_TEXTURES'
+
+def image_path(output_path, material_name, suffix):
+    return f"{output_path}/{material_name}_{suffix.upper()}.png"
+
+def save_image(image, file_path):
+    image.filepath_raw = file_path
+    image.file_format = 'PNG'
+    image.save()
+
+def object_materials(obj):
+    """Unikalne materiały slotów obiektu (ten sam materiał w kilku slotach bake'ujemy raz)."""
+    materials = []
+    for slot in obj.material_slots:
+        if slot.material and slot.material not in materials:
+            materials.append(slot.material)
+    return materials
+
+def srgb_from_linear(values):
+    values = np.clip(values, 0.0, None)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * np.power(values, 1 / 2.4) - 0.055)
+
+def constant_value(scene, material, channel):
+    """RGBA, które dałby bake kanału z niepodłączonym socketem BSDF; None gdy kanał trzeba zbake'ować."""
+    label, prop_name, socket_name, suffix, bake_type = channel
+    bsdf_node, output_node = find_bake_nodes(material)
+    socket = bsdf_node.inputs[socket_name]
+    if socket.is_linked:
+        return None
+    if bake_type == 'NORMAL':
+        # Podłączony Displacement wyjścia materiału też zmienia normalne (bump/przesunięcie)
+        displacement = output_node.inputs.get("Displacement")
+        if displacement is not None and displacement.is_linked:
+            return None
+        # Bez podłączonej normalnej bake w przestrzeni stycznej to płaski kolor (0.5, 0.5, 1)
+        return (0.5, 0.5, 1.0, 1.0) if scene.render.bake.normal_space == 'TANGENT' else None
+    value = socket.default_value
+    if isinstance(value, float):
+        return (value, value, value, 1.0)
+    return (value[0], value[1], value[2], 1.0)
+
+def constant_image(material, channel, rgba, size):
+    """Obraz stałego kanału: jeden zapis piksela 1x1, powiększenie (po stronie C) do size."""
+    suffix = channel[3]
+    image = new_bake_image(material, suffix, 1)
+    pixel = np.array(rgba, dtype=np.float32)
+    if suffix == 'base_color':
+        # Bufor bajtowy sRGB przechowuje wartości zakodowane, bake zapisuje liniowe
+        pixel[:3] = srgb_from_linear(pixel[:3])
+    image.pixels.foreach_set(pixel)
+    if size > 1:
+        image.scale(size, size)
+    return image
+
+def constant_size(props):
+    """None - stałe kanały bake'owane normalnie, 0 - pełny rozmiar, n - obraz n x n."""
+    if not props.skip_constant_channels:
+        return None
+    return 0 if props.constant_image_size == 'FULL' else int(props.constant_image_size)
+
+def link_image(material, channel, image):
+    tex_node = material.node_tree.nodes.new('ShaderNodeTexImage')
+    tex_node.image = image
+    teardown_channel({
+        "material": material,
+        "channel": channel,
+        "image": image,
+        "tex_node": tex_node,
+        "emission_node": None,
+        "original_link": None,
+    }, assign=True)
+
+def bake_channel(context, obj, materials, channel, size, output_path, assign=True, constants=None):
+    """Jeden kanał dla wielu materiałów obiektu jednym wywołaniem bpy.ops.object.bake; zwraca błąd albo None.
+
+    constants (wynik constant_size) - stałe kanały zapisywane bez bake'a; gdy wszystkie są stałe, bake'a nie ma.
+    """
+    label, prop_name, socket_name, suffix, bake_type = channel
+    bakeable = [m for m in materials if find_bake_nodes(m)]
+
+    constant = []
+    if constants is not None:
+        for material in bakeable:
+            rgba = constant_value(context.scene, material, channel)
+            if rgba is None:
+                continue
+            image = constant_image(material, channel, rgba, constants or size)
+            save_image(image, image_path(output_path, material.name, suffix))
+            if assign:
+                link_image(material, channel, image)
+            constant.append(material)
+        bakeable = [m for m in bakeable if m not in constant]
+        if not bakeable:
+            return None
+
+    # Pozostałe materiały obiektu (także te ze stałym kanałem) dostają obrazy tymczasowe
+    others = [m for m in object_materials(obj) if m not in bakeable and m.use_nodes]
+    prepare_bake(context, obj)
+
+    states = [setup_channel(m, channel, new_bake_image(m, suffix, size)) for m in bakeable]
+    states += [setup_scratch(m) for m in others]
+
+    try:
+        bpy.ops.object.bake(type=bake_type, use_clear=True)
+    except RuntimeError as e:
+        for state in states:
+            teardown_channel(state, assign=False)
+        return str(e)
+
+    for state in states:
+        if not state.get("scratch"):
+            save_image(state["image"], image_path(output_path, state["material"].name, suffix))
+        teardown_channel(state, assign)
+    return None
+
+def bake_materials(context, obj, materials, channels, size, output_path, assign=True, constants=None):
+    """Bake kanałów dla wielu materiałów obiektu - jedno wywołanie bpy.ops.object.bake na kanał.
+
+    Zwraca listę (etykieta, błąd) kanałów, których bake się nie udał.
+    """
+    failures = []
+    for channel in channels:
+        error = bake_channel(context, obj, materials, channel, size, output_path, assign, constants)
+        if error:
+            failures.append((channel[0], error))
+    return failures
+
+def selected_material(operator, context):
+    obj = context.active_object
+    props = context.scene.prop_texture_baker
+
+    if not obj or obj.type != 'MESH':
+        operator.report({'ERROR'}, "Select a mesh object")
+        return None
+
+    if props.material_name == 'NONE':
+        operator.report({'ERROR'}, "No material selected")
+        return None
+
+    mat_slot = next((slot for slot in obj.material_slots if slot.material and slot.material.name == props.material_name), None)
+    if not mat_slot:
+        operator.report({'ERROR'}, "Material not found")
+        return None
+
+    material = mat_slot.material
+    if not material.use_nodes:
+        operator.report({'ERROR'}, "Material must use nodes")
+        return None
+
+    if not find_bake_nodes(material):
+        operator.report({'ERROR'}, "Material missing BSDF or Output node")
+        return None
+    return material
+
+
 class BakeSimplifiedShaderOperator(bpy.types.Operator):
     bl_idname = "bake.shader_simplified"
     bl_label = "Bake Selected Channels (No UV Setup)"
@@ -54,90 +363,17 @@ class BakeSimplifiedShaderOperator(bpy.types.Operator):
     def execute(self, context):
         obj = context.active_object
         props = context.scene.prop_texture_baker
-        size = int(props.texture_size)
-        output_path = bpy.path.abspath(props.bake_output_path)
-
-        if not obj or obj.type != 'MESH':
-            self.report({'ERROR'}, "Select a mesh object")
+        material = selected_material(self, context)
+        if not material:
             return {'CANCELLED'}
 
-        if props.material_name == 'NONE':
-            self.report({'ERROR'}, "No material selected")
-            return {'CANCELLED'}
-
-        mat_slot = next((slot for slot in obj.material_slots if slot.material and slot.material.name == props.material_name), None)
-        if not mat_slot:
-            self.report({'ERROR'}, "Material not found")
-            return {'CANCELLED'}
-
-        material = mat_slot.material
-        if not material.use_nodes:
-            self.report({'ERROR'}, "Material must use nodes")
-            return {'CANCELLED'}
-
-        node_tree = material.node_tree
-        bsdf_node = next((n for n in node_tree.nodes if n.type == 'BSDF_PRINCIPLED'), None)
-        output_node = next((n for n in node_tree.nodes if n.type == 'OUTPUT_MATERIAL'), None)
-        if not bsdf_node or not output_node:
-            self.report({'ERROR'}, "Missing BSDF or Output node")
-            return {'CANCELLED'}
-
-        bake_channels = {
-            "Base Color": (props.bake_base_color, "Base Color", 'base_color'),
-            "Roughness": (props.bake_roughness, "Roughness", 'roughness'),
-            "Metallic": (props.bake_metallic, "Metallic", 'metallic'),
-            "Alpha": (props.bake_alpha, "Alpha", 'alpha'),
-            "Normal": (props.bake_normal_map, "Normal", 'normal')
-        }
-
-        for label, (enabled, socket_name, suffix) in bake_channels.items():
-            if not enabled:
-                continue
-
-            image_name = f"{material.name}_{suffix.upper()}"
-            image = bpy.data.images.new(name=image_name, width=size, height=size, alpha=True)
-            image.colorspace_settings.name = 'sRGB' if suffix == 'base_color' else 'Non-Color'
-
-            tex_node = node_tree.nodes.new('ShaderNodeTexImage')
-            tex_node.image = image
-            tex_node.select = True
-            node_tree.nodes.active = tex_node
-
-            emission_node = node_tree.nodes.new('ShaderNodeEmission')
-            if bsdf_node.inputs[socket_name].is_linked:
-                from_socket = bsdf_node.inputs[socket_name].links[0].from_socket
-                node_tree.links.new(emission_node.inputs["Color"], from_socket)
-            else:
-                val = bsdf_node.inputs[socket_name].default_value
-                if isinstance(val, float):
-                    emission_node.inputs["Color"].default_value = (val, val, val, 1)
-                else:
-                    emission_node.inputs["Color"].default_value = val
-
-            node_tree.links.new(output_node.inputs["Surface"], emission_node.outputs["Emission"])
-
-            bpy.ops.object.select_all(action='DESELECT')
-            obj.select_set(True)
-            context.view_layer.objects.active = obj
-
-            bpy.context.scene.render.bake.use_selected_to_active = False
-            bpy.context.scene.render.bake.use_clear = True
-            bpy.context.scene.render.bake.margin = 2
-            bpy.context.scene.render.bake.target = 'IMAGE_TEXTURES'
-
-            try:
-                bpy.ops.object.bake(type='EMIT', use_clear=True)
-            except RuntimeError as e:
-                self.report({'WARNING'}, f"Bake failed for {label}: {str(e)}")
-                continue
-
-            file_path = f"{output_path}/{image_name}.png"
-            image.filepath_raw = file_path
-            image.file_format = 'PNG'
-            image.save()
-
-            node_tree.nodes.remove(emission_node)
-            node_tree.nodes.remove(tex_node)
+        failures = bake_materials(
+            context, obj, [material], enabled_channels(props),
+            int(props.texture_size), bpy.path.abspath(props.bake_output_path), assign=False,
+            constants=constant_size(props)
+        )
+        for label, error in failures:
+            self.report({'WARNING'}, f"Bake failed for {label}: {error}")
 
         self.report({'INFO'}, "Selected channels baked (simplified)")
         return {'FINISHED'}
@@ -149,130 +385,365 @@ class BakeSingleOperator(bpy.types.Operator):
     def execute(self, context):
         obj = context.active_object
         props = context.scene.prop_texture_baker
-        size = int(props.texture_size)
-        output_path = bpy.path.abspath(props.bake_output_path)
-
-        if not obj or obj.type != 'MESH':
-            self.report({'ERROR'}, "Select a mesh object")
+        material = selected_material(self, context)
+        if not material:
             return {'CANCELLED'}
 
-        if props.material_name == 'NONE':
-            self.report({'ERROR'}, "No material selected")
-            return {'CANCELLED'}
+        failures = bake_materials(
+            context, obj, [material], enabled_channels(props),
+            int(props.texture_size), bpy.path.abspath(props.bake_output_path),
+            constants=constant_size(props)
+        )
+        for label, error in failures:
+            self.report({'WARNING'}, f"Bake failed for {label}: {error}")
 
-        mat = next((slot for slot in obj.material_slots if slot.material and slot.material.name == props.material_name), None)
-        if not mat:
-            self.report({'ERROR'}, "Material not found")
-            return {'CANCELLED'}
+        self.report({'INFO'}, "Bake completed and textures assigned")
+        return {'FINISHED'}
 
-        material = mat.material
-        if not material.use_nodes:
-            self.report({'ERROR'}, "Material must use nodes")
-            return {'CANCELLED'}
+class BakeAllObjectOperator(bpy.types.Operator):
+    bl_idname = "bake.texture_object"
+    bl_label = "Bake All for Object"
+
+    def execute(self, context):
+        obj = context.active_object
+        props = context.scene.prop_texture_baker
 
-        node_tree = material.node_tree
-        bsdf_node = next((n for n in node_tree.nodes if n.type == 'BSDF_PRINCIPLED'), None)
-        output_node = next((n for n in node_tree.nodes if n.type == 'OUTPUT_MATERIAL'), None)
-        if not bsdf_node or not output_node:
-            self.report({'ERROR'}, "Material missing BSDF or Output node")
+        if not obj or obj.type != 'MESH':
+            self.report({'ERROR'}, "Select a mesh object")
             return {'CANCELLED'}
 
-        # Zapamiętaj oryginalne połączenie BSDF → Output
-        original_link = next((l for l in node_tree.links if l.from_node == bsdf_node and l.to_node == output_node), None)
+        materials = [m for m in object_materials(obj) if find_bake_nodes(m)]
+        if not materials:
+            self.report({'ERROR'}, "No material with BSDF and Output nodes")
+            return {'CANCELLED'}
 
-        bake_types = {
-            "Base Color": ("bake_base_color", "Base Color", 'base_color', 'EMIT', 'Base Color'),
-            "Roughness": ("bake_roughness", "Roughness", 'roughness', 'EMIT', 'Roughness'),
-            "Metallic": ("bake_metallic", "Metallic", 'metallic', 'EMIT', 'Metallic'),
-            "Alpha": ("bake_alpha", "Alpha", 'alpha', 'EMIT', 'Alpha'),
-            "Normal": ("bake_normal_map", "Normal", 'normal', 'NORMAL', 'Normal')
-        }
+        failures = bake_materials(
+            context, obj, materials, enabled_channels(props),
+            int(props.texture_size), bpy.path.abspath(props.bake_output_path),
+            constants=constant_size(props)
+        )
+        for label, error in failures:
+            self.report({'WARNING'}, f"Bake failed for {label}: {error}")
 
-        for label, (prop_name, socket_name, suffix, bake_type, target_input) in bake_types.items():
-            if not getattr(props, prop_name):
-                continue
+        self.report({'INFO'}, f"Baked {len(materials)} materials")
+        return {'FINISHED'}
 
-            image_name = f"{material.name}_{suffix.upper()}"
-            image = bpy.data.images.new(name=image_name, width=size, height=size, alpha=True)
-            image.colorspace_settings.name = 'sRGB' if suffix == 'base_color' else 'Non-Color'
-
-            tex_node = node_tree.nodes.new('ShaderNodeTexImage')
-            tex_node.image = image
-            tex_node.image.colorspace_settings.name = image.colorspace_settings.name
-            tex_node.select = True
-            node_tree.nodes.active = tex_node
-
-            emission_node = None
-            if bake_type == 'EMIT':
-                emission_node = node_tree.nodes.new('ShaderNodeEmission')
-                if bsdf_node.inputs[target_input].is_linked:
-                    from_socket = bsdf_node.inputs[target_input].links[0].from_socket
-                    node_tree.links.new(emission_node.inputs["Color"], from_socket)
-                else:
-                    val = bsdf_node.inputs[target_input].default_value
-                    if isinstance(val, float):
-                        emission_node.inputs["Color"].default_value = (val, val, val, 1)
-                    else:
-                        emission_node.inputs["Color"].default_value = val
-                node_tree.links.new(output_node.inputs["Surface"], emission_node.outputs["Emission"])
-
-            bpy.ops.object.select_all(action='DESELECT')
-            obj.select_set(True)
-            context.view_layer.objects.active = obj
-
-            bpy.context.scene.render.bake.use_selected_to_active = False
-            bpy.context.scene.render.bake.use_clear = True
-            bpy.context.scene.render.bake.margin = 2
-            bpy.context.scene.render.bake.target = 'IMAGE_TEXTURES'
-
-            try:
-                bpy.ops.object.bake(type=bake_type, use_clear=True)
-            except RuntimeError as e:
-                self.report({'WARNING'}, f"Bake failed for {label}: {str(e)}")
-                continue
+MANIFEST_NAME = "bake_manifest.json"
+
+# Stan kolejki bake'a sceny - czytany przez panel (postęp, ETA) i operator anulowania
+_scene_bake = {"running": False, "cancel": False, "done": 0, "total": 0, "started": 0.0, "baked": 0, "current": ""}
+
+def channel_by_suffix(suffix):
+    return next(channel for channel in BAKE_CHANNELS if channel[3] == suffix)
+
+def build_scene_jobs(context, channels):
+    """Zadania (obiekt, kanał, materiały); materiał współdzielony przez kilka obiektów trafia tylko do pierwszego."""
+    jobs = []
+    seen = set()
+    for obj in context.scene.objects:
+        if obj.type != 'MESH' or obj.hide_render or not obj.visible_get():
+            continue
+        materials = [m.name for m in object_materials(obj) if find_bake_nodes(m) and m.name not in seen]
+        if not materials:
+            continue
+        seen.update(materials)
+        for channel in channels:
+            jobs.append({"object": obj.name, "suffix": channel[3], "materials": materials})
+    return jobs
+
+def job_keys(job):
+    return [f"{material}|{job['suffix']}" for material in job["materials"]]
+
+def load_manifest(output_path, settings):
+    """Manifest wznowienia; wpisy bake'owane z innymi ustawieniami (rozmiar, stałe) są odrzucane."""
+    try:
+        with open(os.path.join(output_path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if not isinstance(manifest, dict) or manifest.get("settings") != settings:
+        return {"settings": settings, "done": [], "failed": {}}
+    manifest.setdefault("failed", {})
+    return manifest
+
+def save_manifest(output_path, manifest):
+    # Zapis przez plik tymczasowy - przerwany zapis nie psuje manifestu
+    path = os.path.join(output_path, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def assign_baked_image(material, channel, path):
+    """Podpina zapisany wcześniej obraz do BSDF (wznowienie w nowej sesji), o ile jeszcze nie jest podpięty."""
+    bsdf_node, _ = find_bake_nodes(material)
+    socket = bsdf_node.inputs[channel[2]]
+    if channel[4] == 'NORMAL' and socket.is_linked:
+        socket = socket.links[0].from_node.inputs.get('Color', socket)
+    if socket.is_linked:
+        from_node = socket.links[0].from_node
+        if from_node.type == 'TEX_IMAGE' and from_node.image and os.path.normpath(bpy.path.abspath(from_node.image.filepath)) == os.path.normpath(path):
+            return
+
+    image = bpy.data.images.load(path, check_existing=True)
+    image.reload()
+    image.colorspace_settings.name = 'sRGB' if channel[3] == 'base_color' else 'Non-Color'
+    link_image(material, channel, image)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bake_worker.py")
+JOB_FOLDER = ".bake_jobs"
+
+def available_memory():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def worker_limit(requested, size, materials_per_job, blend_path):
+    """Liczba workerów ograniczona rdzeniami i wolną pamięcią (szacunek na proces)."""
+    cpus = os.cpu_count() or 1
+    limit = min(requested or cpus, cpus)
+    memory = available_memory()
+    if memory:
+        # Blender + scena (~3x plik) + bufor float RGBA i obraz bajtowy na każdy materiał zadania
+        per_worker = 512 * 2**20 + 3 * os.path.getsize(blend_path) + materials_per_job * size * size * (16 + 4)
+        limit = min(limit, int(memory * 0.8 // per_worker))
+    return max(1, limit)
+
+def launch_worker(job, job_dir, index, size, output_path, threads, constants=None):
+    job_path = os.path.join(job_dir, f"job_{index}.json")
+    payload = dict(job, size=size, output_path=output_path, constants=constants,
+                   result=os.path.join(job_dir, f"job_{index}_result.json"))
+    if os.path.exists(payload["result"]):
+        os.remove(payload["result"])
+    with open(job_path, "w") as f:
+        json.dump(payload, f)
+
+    log = open(os.path.join(job_dir, f"job_{index}.log"), "w")
+    process = subprocess.Popen(
+        [bpy.app.binary_path, "-t", str(threads), "-b", bpy.data.filepath, "--factory-startup",
+         "--python", WORKER_SCRIPT, "--", job_path],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    return {"process": process, "job": job, "result": payload["result"], "log": log}
 
-            file_path = f"{output_path}/{image_name}.png"
-            image.filepath_raw = file_path
-            image.file_format = 'PNG'
-            image.save()
+def worker_error(worker):
+    worker["log"].close()
+    try:
+        with open(worker["result"]) as f:
+            return json.load(f)["error"]
+    except (OSError, ValueError, KeyError):
+        return f"worker exited with code {worker['process'].returncode} (see {worker['log'].name})"
 
-            # Podłącz baked teksturę do odpowiedniego inputu BSDF
-            if target_input in bsdf_node.inputs:
-                node_tree.links.new(bsdf_node.inputs[target_input], tex_node.outputs['Color'])
+class BakeAllSceneOperator(bpy.types.Operator):
+    bl_idname = "bake.texture_scene"
+    bl_label = "Bake All for Scene"
+    bl_description = "Bake every mesh, material and enabled channel of the scene (ESC over its editor or Cancel to stop, resumable)"
 
-            if bake_type == 'NORMAL':
-                normal_map = node_tree.nodes.new('ShaderNodeNormalMap')
-                normal_map.location = (tex_node.location.x + 200, tex_node.location.y)
-                node_tree.links.new(normal_map.inputs['Color'], tex_node.outputs['Color'])
-                node_tree.links.new(bsdf_node.inputs['Normal'], normal_map.outputs['Normal'])
+    _timer = None
 
-            # Usuwamy tymczasowe emissiony, zostawiamy baked node
-            if emission_node:
-                node_tree.nodes.remove(emission_node)
+    def invoke(self, context, event):
+        return self.start(context)
 
-        # Przywróć BSDF do Output
-        if original_link:
-            node_tree.links.new(original_link.to_socket, original_link.from_socket)
+    def execute(self, context):
+        return self.start(context)
 
-        self.report({'INFO'}, "Bake completed and textures assigned")
-        return {'FINISHED'}
+    def start(self, context):
+        if _scene_bake["running"]:
+            self.report({'WARNING'}, "Scene bake already running")
+            return {'CANCELLED'}
 
-class BakeAllObjectOperator(bpy.types.Operator):
-    bl_idname = "bake.texture_object"
-    bl_label = "Bake All for Object"
+        props = context.scene.prop_texture_baker
+        self.parallel = props.parallel_bake
+        if self.parallel and (not bpy.data.is_saved or bpy.data.is_dirty):
+            self.report({'ERROR'}, "Save the file first - background workers read the saved .blend")
+            return {'CANCELLED'}
 
-    def execute(self, context):
-        self.report({'INFO'}, "Bake All for Object executed (to implement)")
-        return {'FINISHED'}
+        self.output_path = bpy.path.abspath(props.bake_output_path)
+        self.size = int(props.texture_size)
+        self.constants = constant_size(props)
+        os.makedirs(self.output_path, exist_ok=True)
 
-class BakeAllSceneOperator(bpy.types.Operator):
-    bl_idname = "bake.texture_scene"
-    bl_label = "Bake All for Scene"
+        settings = {"size": self.size, "constants": self.constants}
+        if props.resume_bake:
+            self.manifest = load_manifest(self.output_path, settings)
+        else:
+            self.manifest = {"settings": settings, "done": [], "failed": {}}
+        done = set(self.manifest["done"])
+        self.jobs = build_scene_jobs(context, enabled_channels(props))
+        self.skipped = 0
+
+        # Wznowienie: zadania z manifestu z istniejącymi plikami tylko podpinamy
+        pending = []
+        for job in self.jobs:
+            paths = [image_path(self.output_path, m, job["suffix"]) for m in job["materials"]]
+            if all(key in done for key in job_keys(job)) and all(os.path.exists(p) for p in paths):
+                self.assign_job(job)
+                self.skipped += 1
+            else:
+                pending.append(job)
+        self.jobs = pending
+
+        if not self.jobs:
+            self.report({'INFO'}, f"Nothing to bake ({self.skipped} jobs already done)")
+            return {'FINISHED'}
+
+        if self.parallel:
+            self.job_dir = os.path.join(self.output_path, JOB_FOLDER)
+            os.makedirs(self.job_dir, exist_ok=True)
+            self.workers = worker_limit(
+                props.max_workers, self.size, max(len(job["materials"]) for job in self.jobs), bpy.data.filepath
+            )
+            self.threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self.running = []
+            self.launched = 0
+
+        _scene_bake.update(
+            running=True, cancel=False, done=0, total=len(self.jobs), started=time.time(), baked=0, current=""
+        )
+        self.failures = []
+        # ESC anuluje tylko nad obszarem, z którego uruchomiono bake; poza nim - przycisk Cancel
+        self.area = context.area
+        context.window_manager.progress_begin(0, len(self.jobs))
+        self._timer = context.window_manager.event_timer_add(0.05 if not self.parallel else 0.5, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def assign_job(self, job):
+        channel = channel_by_suffix(job["suffix"])
+        for material_name in job["materials"]:
+            material = bpy.data.materials.get(material_name)
+            if material and find_bake_nodes(material):
+                assign_baked_image(material, channel, image_path(self.output_path, material_name, job["suffix"]))
+
+    def job_finished(self, context, job, error):
+        label = f"{job['object']}: {channel_by_suffix(job['suffix'])[0]}"
+        if error:
+            self.failures.append((label, error))
+            self.manifest["failed"].update((key, error) for key in job_keys(job))
+        else:
+            self.manifest["done"] = sorted(set(self.manifest["done"]) | set(job_keys(job)))
+            for key in job_keys(job):
+                self.manifest["failed"].pop(key, None)
+            _scene_bake["baked"] += 1
+        save_manifest(self.output_path, self.manifest)
+
+        _scene_bake["done"] += 1
+        context.window_manager.progress_update(_scene_bake["done"])
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+    def event_in_area(self, event):
+        area = self.area
+        try:
+            return (area is not None and area.x <= event.mouse_x < area.x + area.width
+                    and area.y <= event.mouse_y < area.y + area.height)
+        except ReferenceError:
+            # Obszar zamknięty w trakcie bake'a
+            return False
+
+    def modal(self, context, event):
+        if (event.type == 'ESC' and event.value == 'PRESS' and self.event_in_area(event)) or _scene_bake["cancel"]:
+            return self.finish(context, cancelled=True)
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        try:
+            if self.parallel:
+                self.step_parallel(context)
+            else:
+                self.step(context)
+        except Exception as e:
+            # Błąd poza zadaniem (manifest, okno, ...) - kończymy kolejkę zamiast zostawić timer i flagę running
+            traceback.print_exc()
+            self.failures.append(("scene bake", f"{type(e).__name__}: {e}"))
+            return self.finish(context, cancelled=True)
+
+        if _scene_bake["done"] >= len(self.jobs):
+            return self.finish(context, cancelled=False)
+        return {'RUNNING_MODAL'}
+
+    def step(self, context):
+        job = self.jobs[_scene_bake["done"]]
+        obj = context.scene.objects.get(job["object"])
+        materials = [bpy.data.materials[m] for m in job["materials"] if m in bpy.data.materials]
+        channel = channel_by_suffix(job["suffix"])
+        _scene_bake["current"] = f"{job['object']}: {channel[0]}"
+
+        try:
+            if obj:
+                error = bake_channel(
+                    context, obj, materials, channel, self.size, self.output_path, constants=self.constants
+                )
+            else:
+                error = "object removed"
+        except Exception as e:
+            traceback.print_exc()
+            error = f"{type(e).__name__}: {e}"
+        self.job_finished(context, job, error)
+
+    def step_parallel(self, context):
+        for worker in [w for w in self.running if w["process"].poll() is not None]:
+            self.running.remove(worker)
+            error = worker_error(worker)
+            if not error:
+                # Worker tylko zapisał obrazy - podpinamy je do materiałów w tej sesji
+                try:
+                    self.assign_job(worker["job"])
+                except Exception as e:
+                    traceback.print_exc()
+                    error = f"{type(e).__name__}: {e}"
+            self.job_finished(context, worker["job"], error)
+
+        while len(self.running) < self.workers and self.launched < len(self.jobs):
+            self.running.append(launch_worker(
+                self.jobs[self.launched], self.job_dir, self.launched, self.size, self.output_path, self.threads,
+                self.constants
+            ))
+            self.launched += 1
+        _scene_bake["current"] = f"{len(self.running)} workers"
+
+    def finish(self, context, cancelled):
+        try:
+            context.window_manager.event_timer_remove(self._timer)
+            context.window_manager.progress_end()
+            for worker in getattr(self, "running", []):
+                worker["process"].terminate()
+                worker["process"].wait()
+                worker["log"].close()
+        finally:
+            _scene_bake.update(running=False, cancel=False, current="")
+
+        for label, error in self.failures:
+            self.report({'WARNING'}, f"Bake failed for {label}: {error}")
+        state = "cancelled" if cancelled else "finished"
+        self.report({'INFO'}, f"Scene bake {state}: {_scene_bake['baked']} baked, {self.skipped} resumed, "
+                              f"{len(self.failures)} failed")
+        return {'CANCELLED'} if cancelled else {'FINISHED'}
+
+class BakeSceneCancelOperator(bpy.types.Operator):
+    bl_idname = "bake.texture_scene_cancel"
+    bl_label = "Cancel Scene Bake"
+    bl_description = "Stop the scene bake after the current job (finished jobs stay in the manifest)"
 
     def execute(self, context):
-        self.report({'INFO'}, "Bake All for Scene executed (to implement)")
+        _scene_bake["cancel"] = True
         return {'FINISHED'}
 
+def scene_bake_eta():
+    done = _scene_bake["done"]
+    if not done:
+        return None
+    elapsed = time.time() - _scene_bake["started"]
+    return elapsed / done * (_scene_bake["total"] - done)
+
 
 # ---------- UI Panel ----------
 class TextureBaker(bpy.types.Panel):
@@ -300,6 +771,11 @@ class TextureBaker(bpy.types.Panel):
         box.label(text="Texture size:")
         box.prop(props, "texture_size")
 
+        row = box.row()
+        row.prop(props, "skip_constant_channels")
+        if props.skip_constant_channels:
+            row.prop(props, "constant_image_size", text="")
+
         box.separator()
         box.label(text="Output folder:")
         box.prop(props, "bake_output_path")
@@ -319,7 +795,22 @@ class TextureBaker(bpy.types.Panel):
             box.operator("bake.texture_single", text="Bake Single", icon='RENDER_STILL')
             box.operator("bake.texture_object", text="Bake All for Object", icon='RENDER_ANIMATION')
         
-        box.operator("bake.texture_scene", text="Bake All for Scene", icon='SCENE_DATA')
+        box.prop(props, "resume_bake")
+        row = box.row()
+        row.prop(props, "parallel_bake")
+        if props.parallel_bake:
+            row.prop(props, "max_workers", text="Workers")
+        if _scene_bake["running"]:
+            eta = scene_bake_eta()
+            row = box.row()
+            row.label(text=f"{_scene_bake['done']}/{_scene_bake['total']} {_scene_bake['current']}")
+            if eta is not None:
+                row.label(text=f"ETA {int(eta // 60)}:{int(eta % 60):02d}")
+            if hasattr(box, "progress"):
+                box.progress(factor=_scene_bake["done"] / max(_scene_bake["total"], 1), text="Baking scene")
+            box.operator("bake.texture_scene_cancel", text="Cancel", icon='CANCEL')
+        else:
+            box.operator("bake.texture_scene", text="Bake All for Scene", icon='SCENE_DATA')
 
 
 # ---------- Register ----------
@@ -329,6 +820,7 @@ classes = [
     BakeSingleOperator,
     BakeAllObjectOperator,
     BakeAllSceneOperator,
+    BakeSceneCancelOperator,
     BakeSimplifiedShaderOperator,
 ]
 